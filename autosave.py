@@ -0,0 +1,92 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains AutoSaver class. Project is marked as changed after
+every action, and saved on background thread once changes stop coming
+for a moment, so many actions in a row cost single save.
+"""
+from threading import Condition, Lock, Thread
+from time import monotonic
+from traceback import print_exc
+from typing import Callable, Optional
+
+AUTOSAVE_DELAY = 1.0  # seconds without changes before saving
+AUTOSAVE_MAX_DELAY = 10.0  # changes are never kept unsaved longer
+
+
+class AutoSaver:
+    """Write-behind saving with debounce."""
+
+    def __init__(
+            self,
+            save: Callable[[], None],
+            delay: float = AUTOSAVE_DELAY,
+            max_delay: float = AUTOSAVE_MAX_DELAY
+    ) -> None:
+        """Constructor of AutoSaver class, starts the saving thread.
+
+        Args:
+            save (Callable[[], None]): Function saving the project, it
+                is called from background thread.
+            delay (float): Seconds without changes before saving.
+            max_delay (float): Longest time changes are kept unsaved.
+        """
+        self.save = save
+        self.delay = delay
+        self.max_delay = max_delay
+        self.condition = Condition()
+        self.save_lock = Lock()
+        self.dirty_since: Optional[float] = None
+        self.due: Optional[float] = None
+        self.closed = False
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def mark_dirty(self) -> None:
+        """Mark project as changed, it is saved after the delay."""
+        with self.condition:
+            now = monotonic()
+            if self.dirty_since is None:
+                self.dirty_since = now
+            self.due = min(now + self.delay, self.dirty_since + self.max_delay)
+            self.condition.notify()
+
+    def flush(self) -> None:
+        """Save pending changes now, on calling thread."""
+        with self.condition:
+            pending = self.dirty_since is not None
+            self.dirty_since = self.due = None
+        with self.save_lock:
+            if not pending:
+                return
+            try:
+                self.save()
+            except BaseException:
+                self.mark_dirty()
+                raise
+
+    def close(self) -> None:
+        """Save pending changes and stop the saving thread."""
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        """Loop of saving thread."""
+        while True:
+            with self.condition:
+                while not self.closed and (
+                    self.due is None or self.due > monotonic()
+                ):
+                    timeout = None if self.due is None else (
+                        self.due - monotonic()
+                    )
+                    self.condition.wait(timeout)
+                if self.closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                print_exc()
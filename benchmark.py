@@ -0,0 +1,100 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains benchmarks of the slowest parts of the project.
+
+Run from cmd:
+python benchmark.py
+"""
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from highlight import Highlighter, lex_line
+from texfigures import LatexTable
+
+
+def timeit(func: Callable[[], object], repeat: int = 3) -> float:
+    """Best wall time of a few runs of function.
+
+    Args:
+        func (Callable[[], object]): Function to be measured.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def bench_table() -> None:
+    """Compare `write_tab` and `render_tab` for growing tables.
+
+    Time per cell of `render_tab` should stay flat as the table grows.
+    """
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>8} {'cols':>5} {'write_tab':>10} {'render_tab':>11}"
+          + f" {'us/cell':>8}")
+    for rows in (1_000, 5_000, 25_000, 50_000):
+        for cols in (2, 8):
+            df = pd.DataFrame(
+                rng.normal(size=(rows, cols)),
+                columns=[f"col{i}" for i in range(cols)]
+            )
+            table = LatexTable(df)
+            fast = timeit(table.render_tab)
+            if rows <= 5_000:
+                slow = f"{timeit(table.write_tab, 1):10.3f}"
+            else:
+                slow = f"{'-':>10}"
+            print(f"{rows:>8} {cols:>5} {slow} {fast:11.4f}"
+                  + f" {fast / (rows * cols) * 1e6:8.3f}")
+
+
+def bench_highlight(size: int = 1_000_000, visible: int = 40) -> None:
+    """Keystroke latency of highlighting a section of about `size`
+    characters, compared with lexing the whole section.
+
+    Args:
+        size (int): Length of section.
+        visible (int): Number of lines visible in editor.
+    """
+    paragraph = [
+        r"\subsection{Measurement} Voltage $U$ was measured % meter",
+        r"\begin{equation}",
+        r"    I = \frac{U}{R} \pm \Delta I",
+        r"\end{equation}",
+        r"Text with \textbf{bold} and \cite{ref} inside.",
+    ]
+    lines = paragraph * (size // len("\n".join(paragraph)))
+    highlighter = Highlighter(lines.__getitem__)
+    middle = len(lines) // 2
+
+    def keystroke() -> None:
+        lines[middle] += "x"
+        highlighter.edit(middle, 1, 1)
+        for _ in highlighter.tokens(middle - visible // 2,
+                                    middle + visible // 2):
+            pass
+
+    def full() -> None:
+        state = ""
+        for line in lines:
+            _, state = lex_line(line, state)
+
+    first = timeit(keystroke, 1)
+    print(f"section of {len(lines)} lines,"
+          + f" {sum(map(len, lines)) + len(lines)} characters")
+    print(f"first keystroke {first * 1e3:10.3f} ms")
+    print(f"next keystrokes {timeit(keystroke, 50) * 1e3:10.3f} ms")
+    print(f"whole section   {timeit(full, 1) * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    bench_table()
+    bench_highlight()
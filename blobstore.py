@@ -0,0 +1,94 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains BlobStore class. Pictures added to projects are stored
+once, under their SHA-256, and projects only refer to them. Same
+picture used in many projects takes space only once.
+"""
+import json
+import os
+from shutil import copyfile
+from tempfile import mkstemp
+from typing import Dict, Tuple
+
+from manifest import file_hash
+from settings import blob_path, write_atomic
+
+ASSETS_NAME = ".assets.json"
+
+
+class BlobStore:
+    """Content-addressed store of files."""
+
+    def __init__(self, root: str = blob_path) -> None:
+        """Constructor of BlobStore class.
+
+        Args:
+            root (str): Folder of the store.
+        """
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        """Path of blob with given hash.
+
+        Args:
+            digest (str): SHA-256 of blob.
+
+        Returns:
+            str: Path to blob.
+        """
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def exists(self, digest: str) -> bool:
+        """Whether blob is in the store."""
+        return os.path.exists(self.path(digest))
+
+    def put(self, source: str) -> Tuple[str, bool]:
+        """Add file to the store, file already stored is not copied.
+
+        Args:
+            source (str): Path to file.
+
+        Returns:
+            Tuple[str, bool]: SHA-256 of file and whether it was copied.
+        """
+        digest = file_hash(source)
+        if self.exists(digest):
+            return digest, False
+        folder = os.path.dirname(self.path(digest))
+        os.makedirs(folder, exist_ok=True)
+        handle, temp = mkstemp(dir=folder)
+        os.close(handle)
+        try:
+            copyfile(source, temp)
+            os.replace(temp, self.path(digest))
+        except BaseException:
+            os.remove(temp)
+            raise
+        return digest, True
+
+
+def load_assets(folder: str) -> Dict[str, str]:
+    """Load references of project to blobs.
+
+    Args:
+        folder (str): Project folder.
+
+    Returns:
+        Dict[str, str]: File names mapped to SHA-256 of blobs.
+    """
+    try:
+        with open(os.path.join(folder, ASSETS_NAME), "rt") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_assets(folder: str, assets: Dict[str, str]) -> None:
+    """Save references of project to blobs.
+
+    Args:
+        folder (str): Project folder.
+        assets (Dict[str, str]): File names mapped to SHA-256 of blobs.
+    """
+    write_atomic(
+        os.path.join(folder, ASSETS_NAME), json.dumps(assets, indent=4)
+    )
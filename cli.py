@@ -0,0 +1,159 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Headless command line interface. Exports one, many or all projects
+without starting GUI, projects are exported in parallel.
+
+Run from cmd:
+python cli.py export --all --out exported
+python cli.py export FirstProject OtherProject --out exported
+"""
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+from traceback import format_exc
+from typing import List, NamedTuple, Optional
+
+from latex import TexFile
+from packing import STRATEGIES, PackResult, details
+from settings import load_settings
+
+
+class ExportResult(NamedTuple):
+    """Result of exporting single project."""
+    name: str
+    seconds: float
+    packed: List[PackResult]
+    error: Optional[str]
+
+
+def export_project(
+        name: str,
+        folder: str,
+        title: str,
+        out: str,
+        strategy: str = STRATEGIES[0]
+) -> ExportResult:
+    """Export project to `out/name` folder, run in worker process.
+
+    Args:
+        name (str): Name of the project.
+        folder (str): Project folder.
+        title (str): Name of project `.json` file.
+        out (str): Folder for exported projects.
+        strategy (str): First packing method to be tried.
+
+    Returns:
+        ExportResult: Timing, packed files and errors of export.
+    """
+    start = perf_counter()
+    try:
+        results = TexFile(folder, title).export(
+            os.path.join(out, name), strategy=strategy
+        )
+    except Exception:
+        return ExportResult(name, perf_counter() - start, [], format_exc())
+    return ExportResult(name, perf_counter() - start, results, None)
+
+
+def export_projects(
+        names: List[str],
+        out: str,
+        jobs: Optional[int] = None
+) -> List[ExportResult]:
+    """Export projects in parallel, method and time of every packed
+    file are printed.
+
+    Args:
+        names (List[str]): Names of projects.
+        out (str): Folder for exported projects.
+        jobs (Optional[int]): Number of worker processes.
+
+    Returns:
+        List[ExportResult]: Results, in order of names.
+    """
+    settings = load_settings()
+    projects = settings["projects"]
+    strategy = settings.get("packing", STRATEGIES[0])
+    results = {
+        name: ExportResult(name, 0, [], "No such project.")
+        for name in names if name not in projects
+    }
+    os.makedirs(out, exist_ok=True)
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [
+            pool.submit(
+                export_project, name, *projects[name], out, strategy
+            )
+            for name in names if name in projects
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.name] = result
+            status = "failed" if result.error else "ok"
+            print(f"{result.name}: {status} ({result.seconds:.2f} s)")
+            for line in details(result.packed):
+                print(f"    {line}")
+    return [results[name] for name in names]
+
+
+def summary(results: List[ExportResult], seconds: float) -> str:
+    """Summary of exports, failures with their errors.
+
+    Args:
+        results (List[ExportResult]): Results of exports.
+        seconds (float): Wall time of all exports.
+
+    Returns:
+        str: Summary to be printed.
+    """
+    failed = [result for result in results if result.error]
+    lines = [
+        f"Exported {len(results) - len(failed)}/{len(results)} projects"
+        + f" in {seconds:.2f} s"
+    ]
+    for result in failed:
+        lines.append(f"\n{result.name} failed:\n{result.error.rstrip()}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of command line interface.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments.
+
+    Returns:
+        int: Exit code, 1 if any export failed.
+    """
+    parser = ArgumentParser(description="LaTeX file template creator")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="export projects")
+    export.add_argument("projects", nargs="*", help="names of projects")
+    export.add_argument(
+        "--all", action="store_true", help="export all projects"
+    )
+    export.add_argument(
+        "--out", required=True, help="folder for exported projects"
+    )
+    export.add_argument(
+        "--jobs", type=int, default=None, help="number of processes"
+    )
+    commands.add_parser("list", help="list projects")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in load_settings()["projects"]:
+            print(name)
+        return 0
+    names = list(load_settings()["projects"]) if args.all else args.projects
+    if not names:
+        parser.error("give names of projects or --all")
+    start = perf_counter()
+    results = export_projects(names, args.out, args.jobs)
+    print(summary(results, perf_counter() - start))
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains CompileService class. It compiles exported projects
+with configurable command (`pdflatex` by default) in background.
+Repeated requests are debounced, newer request cancels build still in
+progress, and PDFs are cached by hash of `main.tex` and its assets, so
+unchanged project is never compiled twice.
+"""
+import hashlib
+import json
+import os
+import subprocess
+from shutil import copyfile
+from threading import Lock, Thread, Timer
+from typing import Callable, List, NamedTuple, Optional
+
+from manifest import MANIFEST_NAME, ExportManifest, file_hash
+from settings import pdf_cache_path
+
+DEFAULT_COMPILER = [
+    "pdflatex", "-interaction=nonstopmode", "-halt-on-error", "main.tex"
+]
+COMPILE_DELAY = 0.5  # seconds of quiet before compilation starts
+# Files created by compilation, they are not part of the cache key.
+BUILD_SUFFIXES = (".aux", ".log", ".out", ".pdf", ".toc", ".synctex.gz")
+
+
+class CompileResult(NamedTuple):
+    """Result of compilation."""
+    pdf: Optional[str]
+    cached: bool
+    returncode: int
+    log: str
+
+
+def project_key(folder: str) -> str:
+    """Hash of `main.tex` and assets of exported project. Hashes kept
+    in export manifest are used, when it is present.
+
+    Args:
+        folder (str): Exported project folder.
+
+    Returns:
+        str: Hex digest.
+    """
+    if os.path.exists(os.path.join(folder, MANIFEST_NAME)):
+        entries = ExportManifest(folder).entries
+        hashes = {name: entry["hash"] for name, entry in entries.items()}
+    else:
+        hashes = {
+            name: file_hash(os.path.join(folder, name))
+            for name in os.listdir(folder)
+            if os.path.isfile(os.path.join(folder, name))
+            and not name.endswith(BUILD_SUFFIXES)
+        }
+    return hashlib.sha256(
+        json.dumps(sorted(hashes.items())).encode("utf-8")
+    ).hexdigest()
+
+
+class CompileService:
+    """Debounced, cancellable and cached compilation of projects."""
+
+    def __init__(
+            self,
+            command: Optional[List[str]] = None,
+            delay: float = COMPILE_DELAY,
+            cache: str = pdf_cache_path
+    ) -> None:
+        """Constructor of CompileService class.
+
+        Args:
+            command (Optional[List[str]]): Compiler command, run in
+                project folder. It must produce `main.pdf`.
+            delay (float): Seconds of quiet before compilation starts.
+            cache (str): Folder of cached PDFs.
+        """
+        self.command = command or DEFAULT_COMPILER
+        self.delay = delay
+        self.cache = cache
+        self.lock = Lock()
+        self.timer: Optional[Timer] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.generation = 0
+
+    def request(
+            self,
+            folder: str,
+            on_done: Callable[[CompileResult], None]
+    ) -> None:
+        """Ask for compilation of the project. Compilation starts after
+        the delay, unless newer request comes first. Build still in
+        progress is cancelled.
+
+        Args:
+            folder (str): Exported project folder.
+            on_done (Callable[[CompileResult], None]): Called from
+                background thread with result, also when build failed
+                with exception. It is not called for cancelled builds.
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = Timer(
+                self.delay, self._start, (folder, generation, on_done)
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def cancel(self) -> None:
+        """Cancel waiting request and build in progress."""
+        with self.lock:
+            self.generation += 1
+            if self.timer is not None:
+                self.timer.cancel()
+            if self.process is not None:
+                self.process.kill()
+
+    def _start(
+            self,
+            folder: str,
+            generation: int,
+            on_done: Callable[[CompileResult], None]
+    ) -> None:
+        """Start build of request, that was not replaced by newer one."""
+        with self.lock:
+            if generation != self.generation:
+                return
+            if self.process is not None:
+                self.process.kill()
+        Thread(
+            target=self._build,
+            args=(folder, generation, on_done),
+            daemon=True
+        ).start()
+
+    def _build(
+            self,
+            folder: str,
+            generation: int,
+            on_done: Callable[[CompileResult], None]
+    ) -> None:
+        """Compile project, run on background thread. Errors are
+        reported as failed compilation.
+        """
+        try:
+            result = self.compile(folder, generation)
+        except Exception as error:
+            result = CompileResult(
+                None, False, -1, f"{type(error).__name__}: {error}"
+            )
+        if result is not None and generation == self.generation:
+            on_done(result)
+
+    def compile(
+            self,
+            folder: str,
+            generation: Optional[int] = None
+    ) -> Optional[CompileResult]:
+        """Compile project now, or take PDF from cache.
+
+        Args:
+            folder (str): Exported project folder.
+            generation (Optional[int]): Request being built, build is
+                abandoned when newer request comes.
+
+        Returns:
+            Optional[CompileResult]: Result, None if build was
+                cancelled.
+        """
+        pdf = os.path.join(folder, "main.pdf")
+        cached = os.path.join(self.cache, project_key(folder) + ".pdf")
+        if os.path.exists(cached):
+            copyfile(cached, pdf)
+            return CompileResult(pdf, True, 0, "")
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return None
+            process = self.process = subprocess.Popen(
+                self.command,
+                cwd=folder,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace"
+            )
+        log, _ = process.communicate()
+        with self.lock:
+            if self.process is process:
+                self.process = None
+            if generation is not None and generation != self.generation:
+                return None
+        if process.returncode != 0 or not os.path.exists(pdf):
+            return CompileResult(None, False, process.returncode, log)
+        os.makedirs(self.cache, exist_ok=True)
+        copyfile(pdf, cached)
+        return CompileResult(pdf, False, 0, log)
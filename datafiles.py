@@ -0,0 +1,259 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains helpers for reading data files (`.csv` and `.xlsx`)
+that are turned into tables, one by one or many of them at once. Every
+file of many is rendered by separate job on process pool of scheduler,
+and collected by TableBatch.
+"""
+import glob
+import os
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterator, List, Mapping, NamedTuple, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from numformat import NumberFormat
+from settings import SHEET_CACHE_SIZE
+from texfigures import LatexTable, escape_tex
+
+DATA_EXTENSIONS = (".csv", ".xlsx")
+
+
+def to_numbers(df: pd.DataFrame, decimal: str = ".") -> pd.DataFrame:
+    """Convert text columns holding numbers with decimal comma, which
+    `read_excel` leaves as text, to numbers. Column is converted only if
+    all its values are numbers.
+
+    Args:
+        df (pd.DataFrame): Sheet read from `.xlsx` file.
+        decimal (str): Character separating decimal values.
+
+    Returns:
+        pd.DataFrame: Frame with converted columns.
+    """
+    if decimal == ".":
+        return df
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) \
+                or pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        text = series.astype("string").str.strip().str.replace(
+            decimal, ".", regex=False
+        )
+        numbers = pd.to_numeric(text, errors="coerce")
+        if numbers.notna().sum() == series.notna().sum() and len(series):
+            converted[column] = numbers.astype(float)
+    return df.assign(**converted) if converted else df
+
+
+class LazyWorkbook(Mapping):
+    """Read-only mapping of sheet names to data frames of `.xlsx` file.
+
+    Sheet names are read from workbook metadata only, every sheet is
+    parsed when it is accessed for the first time. Recently used sheets
+    are kept in small cache, guarded by lock, as sheets are read by
+    background jobs.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            decimal: str = ".",
+            cache_size: int = SHEET_CACHE_SIZE
+    ) -> None:
+        """Constructor of LazyWorkbook class.
+
+        Args:
+            path (str): Path to `.xlsx` file.
+            decimal (str): Character separating decimal values.
+            cache_size (int): Number of parsed sheets kept in memory.
+        """
+        self.path = path
+        self.decimal = decimal
+        self.cache_size = cache_size
+        self.sheets = self.sheet_names(path)
+        self.cache: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def sheet_names(path: str) -> List[str]:
+        """List sheets of the workbook without parsing them.
+
+        Args:
+            path (str): Path to `.xlsx` file.
+
+        Returns:
+            List[str]: Names of the sheets.
+        """
+        workbook = load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    def __getitem__(self, sheet: str) -> pd.DataFrame:
+        if sheet not in self.sheets:
+            raise KeyError(sheet)
+        with self.lock:
+            if sheet in self.cache:
+                self.cache.move_to_end(sheet)
+                return self.cache[sheet]
+        # parsed without lock, so other sheets are not held up
+        df = to_numbers(
+            pd.read_excel(self.path, sheet_name=sheet),
+            self.decimal
+        )
+        with self.lock:
+            self.cache[sheet] = df
+            self.cache.move_to_end(sheet)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return df
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sheets)
+
+    def __len__(self) -> int:
+        return len(self.sheets)
+
+
+class TableResult(NamedTuple):
+    """Table rendered from data file."""
+    name: str
+    tex: str
+    error: str
+
+
+def natural_key(path: str) -> List:
+    """Sort key of file name, numbers are compared by value, so `run2`
+    comes before `run10`.
+    """
+    return [
+        int(part) if part.isdigit() else part.lower()
+        for part in re.split(r"(\d+)", os.path.basename(path))
+    ]
+
+
+def find_files(pattern: str) -> List[str]:
+    """Find data files in folder or matching glob pattern.
+
+    Args:
+        pattern (str): Folder or glob pattern, e.g. `data/run*.csv`.
+
+    Returns:
+        List[str]: Paths of `.csv` and `.xlsx` files, ordered by name.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*")
+    return sorted(
+        (
+            path for path in glob.glob(pattern)
+            if path.lower().endswith(DATA_EXTENSIONS) and os.path.isfile(path)
+        ),
+        key=natural_key
+    )
+
+
+def render_file(
+        path: str,
+        decimal: str,
+        sep: str,
+        label: str,
+        digits: Optional[int] = None
+) -> TableResult:
+    """Read data file and render it as table captioned by its name, run
+    in worker process. First sheet of `.xlsx` file is used.
+
+    Args:
+        path (str): Path to data file.
+        decimal (str): Character separating decimal values, used in
+            table too.
+        sep (str): Character separating columns of `.csv` file.
+        label (str): Label of the table.
+        digits (Optional[int]): Significant figures of numbers.
+
+    Returns:
+        TableResult: TeX code of table, or error if file was not read.
+    """
+    name = os.path.basename(path)
+    try:
+        if path.lower().endswith(".csv"):
+            df = pd.read_csv(path, decimal=decimal, sep=sep)
+        else:
+            df = to_numbers(pd.read_excel(path), decimal)
+        caption = escape_tex(os.path.splitext(name)[0])
+        table = LatexTable(
+            df, label, caption, NumberFormat(digits=digits, decimal=decimal)
+        )
+        return TableResult(name, table.tex_repr(), "")
+    except Exception as error:
+        return TableResult(name, "", str(error))
+
+
+class TableBatch:
+    """Tables of many files rendered by separate jobs, collected in
+    order of files.
+    """
+
+    def __init__(
+            self,
+            paths: List[str],
+            on_complete: Callable[[List[TableResult]], None],
+            on_cancel: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Constructor of TableBatch class.
+
+        Args:
+            paths (List[str]): Paths to data files, in order of tables.
+            on_complete (Callable[[List[TableResult]], None]): Called
+                with all tables, when the last one is added.
+            on_cancel (Optional[Callable[[], None]]): Called once, when
+                the first job of batch is cancelled.
+        """
+        self.paths = paths
+        self.on_complete = on_complete
+        self.on_cancel = on_cancel
+        self.results: List[Optional[TableResult]] = [None] * len(paths)
+        self.done = 0
+        self.cancelled = False
+
+    def add(self, num: int, result: TableResult) -> None:
+        """Add rendered table.
+
+        Args:
+            num (int): Index of file.
+            result (TableResult): Rendered table.
+        """
+        if self.cancelled:
+            return
+        if self.results[num] is None:
+            self.done += 1
+        self.results[num] = result
+        if self.done == len(self.paths):
+            self.on_complete(self.results)
+
+    def fail(self, num: int, error: BaseException) -> None:
+        """Add file, of which job failed, e.g. its worker died.
+
+        Args:
+            num (int): Index of file.
+            error (BaseException): Raised error.
+        """
+        self.add(
+            num,
+            TableResult(os.path.basename(self.paths[num]), "", str(error))
+        )
+
+    def cancel(self) -> None:
+        """Drop batch, when its job was cancelled. Tables rendered so far
+        are not inserted, batch never completes.
+        """
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self.on_cancel is not None:
+            self.on_cancel()
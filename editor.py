@@ -0,0 +1,287 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains EditorCache class. Every recently used section has its
+own editor widget, so switching between sections only swaps widgets,
+and each section keeps its cursor, scroll position and undo history.
+Least recently used editors are dropped when their text exceeds memory
+budget. Module contains also WindowedBuffer class, used for large
+sections, only part of them is loaded into editor and long generated
+blocks are folded. Placeholders of folded blocks must not be edited.
+"""
+from collections import Counter, OrderedDict
+from tkinter import Text
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+EDITOR_BUDGET = 4_000_000  # characters kept in cached editors
+LARGE_SECTION = 500_000  # sections longer than that are windowed
+WINDOW_LINES = 2000
+WINDOW_MARGIN = 500
+FOLD_ENVS = ("tabular", "longtable", "array")
+FOLD_LINES = 50
+
+
+def text_widget(editor: Any) -> Text:
+    """Text widget of editor. CTkTextbox is a frame around tkinter
+    Text kept in `_textbox`, and lacks some of its methods, e.g. count.
+
+    Args:
+        editor (Any): CTkTextbox or Text widget.
+
+    Returns:
+        Text: Widget, which text is edited.
+    """
+    return getattr(editor, "_textbox", None) or editor
+
+
+class EditorCache:
+    """Least recently used cache of section editors."""
+
+    def __init__(
+            self,
+            factory: Callable[[str], Any],
+            sync: Callable[[str, Any], None],
+            budget: int = EDITOR_BUDGET
+    ) -> None:
+        """Constructor of EditorCache class.
+
+        Args:
+            factory (Callable[[str], Any]): Creates editor filled with
+                text of given section.
+            sync (Callable[[str, Any], None]): Writes text of editor
+                back to section, called before editor is dropped.
+            budget (int): Characters of text kept in cached editors.
+        """
+        self.factory = factory
+        self.sync = sync
+        self.budget = budget
+        self.editors: OrderedDict[str, Any] = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.current: Optional[str] = None
+
+    def show(self, section: str, size: int) -> Any:
+        """Show editor of the section, create it if it is not cached.
+
+        Args:
+            section (str): Section to be shown.
+            size (int): Length of text of the section.
+
+        Returns:
+            Any: Editor of the section.
+        """
+        if self.current is not None and self.current != section:
+            self.editors[self.current].place_forget()
+        editor = self.editors.get(section)
+        if editor is None:
+            editor = self.editors[section] = self.factory(section)
+        self.editors.move_to_end(section)
+        self.sizes[section] = size
+        self.current = section
+        editor.place(x=0, y=0)
+        self.evict()
+        return editor
+
+    def get(self, section: str) -> Optional[Any]:
+        """Editor of the section, if it is cached."""
+        return self.editors.get(section)
+
+    def resize(self, section: str, size: int) -> None:
+        """Update length of text of cached section, budget is checked
+        on next `show` or `evict`.
+
+        Args:
+            section (str): Section of editor.
+            size (int): Length of text.
+        """
+        if section in self.editors:
+            self.sizes[section] = size
+
+    def evict(self) -> None:
+        """Drop least recently used editors over the budget, editor
+        shown at the moment is always kept.
+        """
+        while sum(self.sizes.values()) > self.budget and len(self.editors) > 1:
+            section = next(iter(self.editors))
+            if section == self.current:
+                self.editors.move_to_end(section)
+                continue
+            self.drop(section)
+
+    def drop(self, section: str, sync: bool = True) -> None:
+        """Destroy editor of the section.
+
+        Args:
+            section (str): Section of editor.
+            sync (bool): Write text of editor back to section first.
+        """
+        editor = self.editors.pop(section, None)
+        self.sizes.pop(section, None)
+        if editor is None:
+            return
+        if sync:
+            self.sync(section, editor)
+        if self.current == section:
+            self.current = None
+        editor.destroy()
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Cached sections with their editors."""
+        return iter(list(self.editors.items()))
+
+
+def fold_blocks(
+        lines: List[str],
+        envs: Tuple[str, ...] = FOLD_ENVS,
+        min_lines: int = FOLD_LINES
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Replace bodies of long environments with placeholder lines.
+
+    Args:
+        lines (List[str]): Lines of text.
+        envs (Tuple[str, ...]): Environments to be folded.
+        min_lines (int): Shortest body to be folded.
+
+    Returns:
+        Tuple[List[str], Dict[str, List[str]]]: Folded lines and folded
+            bodies by their placeholders.
+    """
+    output = []
+    folds = {}
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        output.append(line)
+        index += 1
+        env = next(
+            (env for env in envs if f"\\begin{{{env}}}" in line), None
+        )
+        if env is None:
+            continue
+        end = index
+        while end < len(lines) and f"\\end{{{env}}}" not in lines[end]:
+            end += 1
+        if end == len(lines) or end - index < min_lines:
+            continue
+        placeholder = f"%<fold {len(folds)}: {env}, {end - index} lines>%"
+        folds[placeholder] = lines[index:end]
+        output.append(placeholder)
+        index = end
+    return output, folds
+
+
+class WindowedBuffer:
+    """Text of large section, of which only window of lines is loaded
+    into editor.
+    """
+
+    def __init__(
+            self,
+            text: str,
+            window: int = WINDOW_LINES,
+            margin: int = WINDOW_MARGIN,
+            fold: bool = True
+    ) -> None:
+        """Constructor of WindowedBuffer class.
+
+        Args:
+            text (str): Text of section.
+            window (int): Number of lines loaded into editor.
+            margin (int): Lines loaded above line shown first.
+            fold (bool): Fold bodies of long generated environments.
+        """
+        self.lines = text.split("\n")
+        self.folds: Dict[str, List[str]] = {}
+        if fold:
+            self.lines, self.folds = fold_blocks(self.lines)
+        self.size = window
+        self.margin = margin
+        self.start = 0
+        self.end = min(window, len(self.lines))
+
+    @property
+    def window(self) -> str:
+        """Text loaded into editor."""
+        return "\n".join(self.lines[self.start:self.end])
+
+    def at_top(self) -> bool:
+        """Whether window begins with first line."""
+        return self.start == 0
+
+    def at_bottom(self) -> bool:
+        """Whether window ends with last line."""
+        return self.end == len(self.lines)
+
+    def placeholders(self, lines: List[str]) -> Counter:
+        """Placeholders of folded blocks among lines.
+
+        Args:
+            lines (List[str]): Lines of text.
+
+        Returns:
+            Counter: Placeholders with numbers of occurrences.
+        """
+        return Counter(
+            line.strip() for line in lines if line.strip() in self.folds
+        )
+
+    def is_placeholder(self, line: str) -> bool:
+        """Whether line is placeholder of folded block."""
+        return line.strip() in self.folds
+
+    def commit(self, window: str) -> None:
+        """Write edited text of window back to buffer.
+
+        Args:
+            window (str): Text of editor.
+
+        Raises:
+            ValueError: if placeholder of folded block was changed,
+                removed or copied, buffer is left unchanged then.
+        """
+        lines = window.split("\n")
+        if self.placeholders(lines) \
+                != self.placeholders(self.lines[self.start:self.end]):
+            raise ValueError(
+                "Folded block was edited, unfold it before editing"
+            )
+        self.lines[self.start:self.end] = lines
+        self.end = self.start + len(lines)
+
+    def move(self, line: int) -> str:
+        """Move window, so given line is loaded with margin above.
+        Window has to be committed first.
+
+        Args:
+            line (int): Line of buffer, counted from 0.
+
+        Returns:
+            str: Text of new window.
+        """
+        self.start = max(
+            0, min(line - self.margin, len(self.lines) - self.size)
+        )
+        self.end = min(self.start + self.size, len(self.lines))
+        return self.window
+
+    def unfold(self, line: str) -> Optional[str]:
+        """Take body folded under the placeholder.
+
+        Args:
+            line (str): Line of editor.
+
+        Returns:
+            Optional[str]: Folded body, None if line is not placeholder.
+        """
+        body = self.folds.pop(line.strip(), None)
+        if body is None:
+            return None
+        return "\n".join(body)
+
+    def text(self) -> str:
+        """Whole text of section, with folded bodies restored."""
+        output = []
+        for line in self.lines:
+            body = self.folds.get(line.strip()) if "%<fold" in line else None
+            if body is None:
+                output.append(line)
+            else:
+                output.extend(body)
+        return "\n".join(output)
@@ -0,0 +1,164 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains EquationStore class, library of saved equations and
+multiline math in sqlite database. Equations are read one at a time and
+names are searched in database, so size of library does not matter.
+"""
+import json
+import os
+import sqlite3
+from typing import List, Optional
+
+from settings import (Mode, equations_backup_path, equations_path,
+                      load_settings, update_settings, write_atomic)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS equations (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+"""
+
+
+class EquationStore:
+    """Library of equations, by kind and name."""
+
+    def __init__(self, path: str = equations_path) -> None:
+        """Constructor of EquationStore class.
+
+        Args:
+            path (str): Path to database file.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def get(self, kind: str, name: str) -> Optional[str]:
+        """Equation with given name.
+
+        Args:
+            kind (str): `Mode.EQUATION` or `Mode.DISPLAYMATH`.
+            name (str): Name of equation.
+
+        Returns:
+            Optional[str]: TeX code of equation, None if there is none.
+        """
+        row = self.connection.execute(
+            "SELECT body FROM equations WHERE kind = ? AND name = ?",
+            (kind, name)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add(self, kind: str, name: str, body: str) -> bool:
+        """Add equation to library.
+
+        Args:
+            kind (str): `Mode.EQUATION` or `Mode.DISPLAYMATH`.
+            name (str): Name of equation.
+            body (str): TeX code of equation.
+
+        Returns:
+            bool: False if name is already used.
+        """
+        with self.connection as db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO equations VALUES (?, ?, ?)",
+                (kind, name, body)
+            )
+        return cursor.rowcount == 1
+
+    def remove(self, kind: str, name: str) -> None:
+        """Remove equation from library.
+
+        Args:
+            kind (str): `Mode.EQUATION` or `Mode.DISPLAYMATH`.
+            name (str): Name of equation.
+        """
+        with self.connection as db:
+            db.execute(
+                "DELETE FROM equations WHERE kind = ? AND name = ?",
+                (kind, name)
+            )
+
+    def names(self, kind: str, query: str = "", limit: int = 50) -> List[str]:
+        """Names containing query, case insensitive, the ones starting
+        with it first.
+
+        Args:
+            kind (str): `Mode.EQUATION` or `Mode.DISPLAYMATH`.
+            query (str): Part of name.
+            limit (int): Maximal number of names.
+
+        Returns:
+            List[str]: Names of equations.
+        """
+        query = (
+            query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        return [
+            name for name, in self.connection.execute(
+                "SELECT name FROM equations WHERE kind = ?"
+                " AND name LIKE ? ESCAPE '\\'"
+                " ORDER BY name LIKE ? ESCAPE '\\' DESC, name COLLATE NOCASE"
+                " LIMIT ?",
+                (kind, f"%{query}%", f"{query}%", limit)
+            )
+        ]
+
+    def migrate(self, settings: dict, backup: Optional[str] = None) -> bool:
+        """Move equations kept in settings to library. They are removed
+        from settings only after database write was committed, and
+        copied to backup file first.
+
+        Args:
+            settings (dict): Settings of the app, changed in place.
+            backup (Optional[str]): Path to `.json` file, to which moved
+                equations are added, no backup is kept if None.
+
+        Returns:
+            bool: True if settings changed and have to be saved.
+        """
+        kinds = [
+            kind for kind in (Mode.EQUATION, Mode.DISPLAYMATH)
+            if kind in settings
+        ]
+        with self.connection as db:
+            for kind in kinds:
+                db.executemany(
+                    "INSERT OR IGNORE INTO equations VALUES (?, ?, ?)",
+                    (
+                        (kind, name, body)
+                        for name, body in settings[kind].items()
+                    )
+                )
+        if backup is not None and kinds:
+            try:
+                with open(backup, "rt", encoding="utf-8") as file:
+                    saved = json.load(file)
+            except FileNotFoundError:
+                saved = {}
+            for kind in kinds:
+                saved.setdefault(kind, {}).update(settings[kind])
+            write_atomic(backup, json.dumps(saved, indent=4))
+        for kind in kinds:
+            del settings[kind]
+        return bool(kinds)
+
+
+_equation_store: Optional[EquationStore] = None
+
+
+def equation_store() -> EquationStore:
+    """Library of equations, opened on first call. Equations kept in
+    settings by older versions are moved to it.
+    """
+    global _equation_store
+    if _equation_store is None:
+        _equation_store = EquationStore()
+        settings = load_settings()
+        if _equation_store.migrate(settings, equations_backup_path):
+            update_settings(settings)
+    return _equation_store
@@ -0,0 +1,289 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains LaTeX syntax highlighting of editor. Lines are lexed one
+by one, lexer state at beginning of every line is remembered, so after
+an edit only changed lines are lexed again, until state agrees with the
+remembered one. Tags are applied to visible lines only. Changed lines
+are taken from insert and delete commands of the widget.
+"""
+import re
+from tkinter import TclError, Text
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from editor import text_widget
+
+TOKEN = re.compile(
+    r"(?P<comment>%.*)"
+    r"|(?P<env>\\(?:begin|end)\{[^}]*\})"
+    r"|(?P<math>\$\$?|\\[\[\]()])"
+    r"|(?P<command>\\(?:[A-Za-z@]+|.))"
+)
+OPENERS = {"$": "$", "$$": "$$", "\\[": "\\]", "\\(": "\\)"}
+MATH_ENVS = {
+    "equation", "equation*", "align", "align*", "gather", "gather*",
+    "multline", "multline*", "eqnarray", "eqnarray*", "displaymath",
+    "math"
+}
+TAGS = {
+    "math": "#1a7f37",
+    "command": "#1f6feb",
+    "environment": "#a35200",
+    "comment": "#808080",
+}
+
+Token = Tuple[str, int, int]
+
+
+def lex_line(line: str, state: str) -> Tuple[List[Token], str]:
+    """Split line into highlighted tokens.
+
+    Args:
+        line (str): Line of text.
+        state (str): Math opened before the line, empty if none.
+
+    Returns:
+        Tuple[List[Token], str]: Tokens as (tag, start, end) and math
+            opened at the end of line.
+    """
+    tokens = []
+    math_start = 0 if state else None
+    for match in TOKEN.finditer(line):
+        kind = match.lastgroup
+        text = match.group()
+        start, end = match.span()
+        if kind == "comment":
+            if math_start is not None:
+                tokens.append(("math", math_start, start))
+            tokens.append(("comment", start, end))
+            return tokens, state
+        if kind == "env":
+            name = text[text.index("{") + 1:-1]
+            if text.startswith("\\begin") and not state \
+                    and name in MATH_ENVS:
+                state, math_start = name, end
+            elif text.startswith("\\end") and state == name:
+                tokens.append(("math", math_start, start))
+                state, math_start = "", None
+            tokens.append(("environment", start, end))
+        elif kind == "math":
+            if not state and text in OPENERS:
+                state, math_start = text, start
+            elif state == "$" and text == "$$":
+                # closing `$` followed by opening one
+                tokens.append(("math", math_start, start + 1))
+                math_start = start + 1
+            elif state in OPENERS and OPENERS[state] == text:
+                tokens.append(("math", math_start, end))
+                state, math_start = "", None
+        else:
+            tokens.append(("command", start, end))
+    if math_start is not None:
+        tokens.append(("math", math_start, len(line)))
+    return tokens, state
+
+
+class Highlighter:
+    """Resumable lexer of text split into lines."""
+
+    def __init__(self, get_line: Callable[[int], str]) -> None:
+        """Constructor of Highlighter class.
+
+        Args:
+            get_line (Callable[[int], str]): Returns line of text with
+                given number, counted from 0.
+        """
+        self.get_line = get_line
+        self.states = [""]
+        self.pending: Optional[Tuple[int, List[str]]] = None
+
+    def reset(self) -> None:
+        """Forget all states, when whole text was replaced."""
+        self.states = [""]
+        self.pending = None
+
+    def edit(self, first: int, removed: int, added: int) -> None:
+        """Invalidate states after lines were replaced.
+
+        Args:
+            first (int): First replaced line.
+            removed (int): Number of lines before the edit.
+            added (int): Number of lines after the edit.
+        """
+        if first >= len(self.states):
+            if self.pending is None:
+                return
+            start, tail = self.pending
+            if first + removed <= start:
+                # lines before remembered tail moved it
+                self.pending = (start + added - removed, tail)
+            elif first < start + len(tail):
+                self.pending = None
+            return
+        tail = self.states[first + removed:]
+        self.states = self.states[:first + 1]
+        self.pending = (first + added, tail) if tail else None
+
+    def ensure(self, line: int) -> None:
+        """Lex lines up to the given one, remembered states are reused
+        once lexing after an edit agrees with them.
+
+        Args:
+            line (int): Line, of which state is needed.
+        """
+        while len(self.states) <= line:
+            num = len(self.states) - 1
+            _, state = lex_line(self.get_line(num), self.states[num])
+            self.states.append(state)
+            if self.pending is None or self.pending[0] != num + 1:
+                continue
+            start, tail = self.pending
+            if tail[0] == state:
+                self.states.extend(tail[1:])
+                self.pending = None
+            else:
+                self.pending = (start + 1, tail[1:]) if len(tail) > 1 \
+                    else None
+
+    def tokens(self, first: int, last: int) -> Iterator[Tuple[int, Token]]:
+        """Tokens of lines in range.
+
+        Args:
+            first (int): First line.
+            last (int): Last line, included.
+
+        Yields:
+            Tuple[int, Token]: Number of line and token.
+        """
+        self.ensure(first)
+        state = self.states[first]
+        for num in range(first, last + 1):
+            tokens, state = lex_line(self.get_line(num), state)
+            for token in tokens:
+                yield num, token
+
+
+class TextHighlighter:
+    """Highlighting of tkinter Text widget. Command of widget is wrapped,
+    so every change of text is seen, whatever made it: typing, paste,
+    middle-click, undo, redo or program.
+    """
+
+    def __init__(self, text: Text) -> None:
+        """Constructor of TextHighlighter class, wraps command and binds
+        events of widget. Inner Text of CTkTextbox is wrapped, as edits
+        do not pass through the frame around it.
+
+        Args:
+            text (Text): Highlighted widget, Text or CTkTextbox.
+        """
+        text = text_widget(text)
+        self.text = text
+        self.highlighter = Highlighter(
+            lambda num: text.get(f"{num + 1}.0", f"{num + 1}.0 lineend")
+        )
+        self.scheduled = False
+        self.edits = 0
+        for tag, color in TAGS.items():
+            text.tag_config(tag, foreground=color)
+        text.tag_raise("comment")
+        # same trick as `WidgetRedirector` of IDLE
+        self.widget = str(text)
+        self.original = self.widget + "_highlighted"
+        text.tk.call("rename", self.widget, self.original)
+        text.tk.createcommand(self.widget, self.dispatch)
+        text.bind("<Destroy>", self.close, add="+")
+        text.bind("<Configure>", lambda _: self.schedule(), add="+")
+        self.schedule()
+
+    def call(self, *args: str) -> Any:
+        """Run command of widget, without tracking."""
+        return self.text.tk.call((self.original,) + args)
+
+    def line(self, index: str) -> int:
+        """Line of index, counted from 0."""
+        return int(str(self.call("index", index)).split(".")[0]) - 1
+
+    def lines(self) -> int:
+        """Number of lines of widget."""
+        return self.line("end-1c") + 1
+
+    def dispatch(self, *args: str) -> Any:
+        """Run command of widget, lines changed by it are lexed again.
+        Scrolling by wheel, scrollbar or keyboard passes through `yview`
+        or `see`, lines shown by it are tagged.
+
+        Args:
+            *args (str): Command of widget and its arguments.
+
+        Returns:
+            Any: Result of command.
+        """
+        command = args[0] if args else ""
+        if command == "edit" and args[1:2] in (("undo",), ("redo",)):
+            edits = self.edits
+            result = self.call(*args)
+            if edits == self.edits:
+                # changes of undo were not seen one by one
+                self.reset()
+            return result
+        if command in ("yview", "see") and len(args) > 1:
+            self.schedule()
+        if command not in ("insert", "delete", "replace"):
+            return self.call(*args)
+        indices = {"insert": args[1:2], "replace": args[1:3]}.get(
+            command, args[1:]
+        )
+        first = min(self.line(index) for index in indices)
+        last = max(self.line(f"{index}+1c") for index in indices)
+        before = self.lines()
+        result = self.call(*args)
+        self.edits += 1
+        removed = last - first + 1
+        self.changed(first, removed, removed + self.lines() - before)
+        return result
+
+    def close(self, _=None) -> None:
+        """Remove wrapper of widget command, when widget is destroyed."""
+        try:
+            self.text.tk.deletecommand(self.widget)
+        except TclError:
+            pass
+
+    def changed(self, first: int, removed: int, added: int) -> None:
+        """Tell about changed lines.
+
+        Args:
+            first (int): First replaced line, counted from 0.
+            removed (int): Number of lines before the change.
+            added (int): Number of lines after the change.
+        """
+        self.highlighter.edit(first, removed, added)
+        self.schedule()
+
+    def reset(self) -> None:
+        """Highlight again, after whole text was replaced."""
+        self.highlighter.reset()
+        self.schedule()
+
+    def schedule(self) -> None:
+        """Refresh highlighting when widget is idle."""
+        if not self.scheduled:
+            self.scheduled = True
+            self.text.after_idle(self.refresh)
+
+    def refresh(self) -> None:
+        """Tag visible lines."""
+        self.scheduled = False
+        first = int(self.text.index("@0,0").split(".")[0])
+        last = int(self.text.index(
+            f"@0,{self.text.winfo_height()}"
+        ).split(".")[0])
+        start, end = f"{first}.0", f"{last}.0 lineend"
+        for tag in TAGS:
+            self.text.tag_remove(tag, start, end)
+        ranges: Dict[str, List[str]] = {tag: [] for tag in TAGS}
+        for num, (tag, begin, stop) in self.highlighter.tokens(
+                first - 1, last - 1):
+            ranges[tag] += [f"{num + 1}.{begin}", f"{num + 1}.{stop}"]
+        for tag, indices in ranges.items():
+            if indices:
+                self.text.tag_add(tag, *indices)
@@ -0,0 +1,194 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains JobScheduler class. It runs heavy operations (reading
+data files, exporting, copying pictures) on worker threads or processes
+and hands results back to the GUI thread through `after()` polling, so
+the Tk event loop never freezes.
+"""
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from queue import Empty, Queue
+from threading import Event
+from traceback import print_exception
+from typing import Any, Callable, List, Optional, Set
+
+POLL_MS = 50
+
+
+class JobCancelled(Exception):
+    """Raised inside a job, when it was cancelled by user."""
+
+
+class Job:
+    """Handle of a single background job."""
+
+    def __init__(self, name: str, events: Queue) -> None:
+        """Constructor of Job class.
+
+        Args:
+            name (str): Name of the job shown to user.
+            events (Queue): Queue of events read by the scheduler.
+        """
+        self.name = name
+        self.events = events
+        self.future: Optional[Future] = None
+        self._cancelled = Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether job was cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Ask job to stop. Job that did not start yet is dropped, the
+        running one stops at its next `check()`.
+        """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self) -> None:
+        """Stop the job if it was cancelled.
+
+        Raises:
+            JobCancelled: if job was cancelled.
+        """
+        if self.cancelled:
+            raise JobCancelled(self.name)
+
+    def report(self, done: int, total: int) -> None:
+        """Report progress of the job, can be called from worker.
+
+        Args:
+            done (int): Number of finished steps.
+            total (int): Number of all steps.
+        """
+        self.check()
+        self.events.put(("progress", self, (done, total)))
+
+
+class JobScheduler:
+    """Runs jobs in background and calls callbacks on GUI thread."""
+
+    def __init__(self, root: Any, workers: int = 4) -> None:
+        """Constructor of JobScheduler class.
+
+        Args:
+            root (Any): Tk widget used for `after()` polling.
+            workers (int): Number of worker threads.
+        """
+        self.root = root
+        self.workers = workers
+        self.threads: Executor = ThreadPoolExecutor(workers)
+        self.processes: Optional[Executor] = None
+        self.events: Queue = Queue()
+        self.active: Set[Job] = set()
+        self.callbacks = {}
+        self.polling = None
+
+    def submit(
+            self,
+            name: str,
+            func: Callable[..., Any],
+            *args: Any,
+            on_done: Optional[Callable[[Any], None]] = None,
+            on_error: Optional[Callable[[BaseException], None]] = None,
+            on_progress: Optional[Callable[[Job, int, int], None]] = None,
+            on_cancel: Optional[Callable[[], None]] = None,
+            process: bool = False
+    ) -> Job:
+        """Run function in background.
+
+        Thread jobs are called as ``func(job, *args)`` and can report
+        progress and check for cancellation. Process jobs are called as
+        ``func(*args)``, so function and arguments must be picklable.
+
+        Args:
+            name (str): Name of the job shown to user.
+            func (Callable[..., Any]): Function to be run.
+            on_done (Optional[Callable[[Any], None]]): Called with
+                result of the function.
+            on_error (Optional[Callable[[BaseException], None]]): Called
+                with exception raised by the function, cancellation
+                excluded. By default exception is printed.
+            on_progress (Optional[Callable[[Job, int, int], None]]):
+                Called with job and its progress.
+            on_cancel (Optional[Callable[[], None]]): Called, when job
+                was cancelled.
+            process (bool): Run function in process pool.
+
+        Returns:
+            Job: Handle of the job.
+        """
+        job = Job(name, self.events)
+        self.callbacks[job] = (on_done, on_error, on_progress, on_cancel)
+        self.active.add(job)
+        if process:
+            if self.processes is None:
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import get_context
+
+                # forking process running Tk and worker threads may
+                # deadlock the child
+                self.processes = ProcessPoolExecutor(
+                    self.workers, get_context("spawn")
+                )
+            job.future = self.processes.submit(func, *args)
+        else:
+            job.future = self.threads.submit(func, job, *args)
+        job.future.add_done_callback(
+            lambda future: self.events.put(("done", job, future))
+        )
+        if self.polling is None:
+            self.polling = self.root.after(POLL_MS, self.poll)
+        return job
+
+    def poll(self) -> None:
+        """Dispatch events of jobs, it is run on GUI thread."""
+        while True:
+            try:
+                kind, job, data = self.events.get_nowait()
+            except Empty:
+                break
+            on_done, on_error, on_progress, on_cancel = self.callbacks[job]
+            if kind == "progress":
+                if on_progress is not None and not job.cancelled:
+                    on_progress(job, *data)
+                continue
+            self.active.discard(job)
+            del self.callbacks[job]
+            error = None if data.cancelled() else data.exception()
+            if data.cancelled() or job.cancelled \
+                    or isinstance(error, JobCancelled):
+                if on_cancel is not None:
+                    on_cancel()
+                continue
+            if error is not None:
+                if on_error is None:
+                    print_exception(
+                        type(error), error, error.__traceback__
+                    )
+                else:
+                    on_error(error)
+            elif on_done is not None:
+                on_done(data.result())
+        self.polling = None
+        if self.active:
+            self.polling = self.root.after(POLL_MS, self.poll)
+
+    def running(self) -> List[Job]:
+        """List jobs that did not finish yet."""
+        return list(self.active)
+
+    def cancel_all(self) -> None:
+        """Cancel all jobs."""
+        for job in self.running():
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel all jobs and stop the workers."""
+        self.cancel_all()
+        if self.polling is not None:
+            self.root.after_cancel(self.polling)
+            self.polling = None
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=False, cancel_futures=True)
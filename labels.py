@@ -0,0 +1,153 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains LabelIndex class, index of labels, references and
+included graphics of all sections of project. Only sections changed
+since last update are scanned again.
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+REFERENCE = re.compile(
+    r"\\(label|ref|eqref|pageref|autoref|cref|Cref|includegraphics)"
+    r"\*?(?:\[[^\]]*\])?\{([^}]*)\}"
+)
+COMMENT = re.compile(r"(?<!\\)%.*")
+PREFIXES = {"figure": "fig", "table": "tab", "equation": "eq"}
+
+Entry = Tuple[str, Counter, Counter, Counter]
+
+
+def scan(text: str) -> Tuple[Counter, Counter, Counter]:
+    """Find labels, references and included graphics in text, comments
+    are skipped.
+
+    Args:
+        text (str): Text of section.
+
+    Returns:
+        Tuple[Counter, Counter, Counter]: Labels, references and
+            graphics with numbers of occurrences.
+    """
+    labels, refs, graphics = Counter(), Counter(), Counter()
+    for match in REFERENCE.finditer(COMMENT.sub("", text)):
+        command, argument = match.groups()
+        if command == "label":
+            labels[argument.strip()] += 1
+        elif command == "includegraphics":
+            graphics[argument.strip()] += 1
+        else:
+            refs.update(key.strip() for key in argument.split(","))
+    return labels, refs, graphics
+
+
+class LabelIndex:
+    """Index of labels, references and graphics of project."""
+
+    def __init__(self, text: Optional[Mapping[str, str]] = None) -> None:
+        """Constructor of LabelIndex class.
+
+        Args:
+            text (Optional[Mapping[str, str]]): Sections to be indexed.
+        """
+        self.sections: Dict[str, Entry] = {}
+        self.labels: Counter = Counter()
+        self.refs: Counter = Counter()
+        self.graphics: Counter = Counter()
+        self.reserved = set()
+        if text is not None:
+            self.sync(text)
+
+    def update(self, section: str, text: str) -> None:
+        """Index section again, if its text changed.
+
+        Args:
+            section (str): Title of section.
+            text (str): Text of section.
+        """
+        entry = self.sections.get(section)
+        if entry is not None and (entry[0] is text or entry[0] == text):
+            return
+        self.remove(section)
+        labels, refs, graphics = scan(text)
+        self.sections[section] = (text, labels, refs, graphics)
+        self.labels.update(labels)
+        self.refs.update(refs)
+        self.graphics.update(graphics)
+
+    def remove(self, section: str) -> None:
+        """Remove section from index.
+
+        Args:
+            section (str): Title of section.
+        """
+        entry = self.sections.pop(section, None)
+        if entry is None:
+            return
+        self.labels.subtract(entry[1])
+        self.refs.subtract(entry[2])
+        self.graphics.subtract(entry[3])
+        for counter in (self.labels, self.refs, self.graphics):
+            for key in [key for key, count in counter.items() if count <= 0]:
+                del counter[key]
+
+    def sync(self, text: Mapping[str, str]) -> None:
+        """Update index from all sections, unchanged ones are skipped.
+
+        Args:
+            text (Mapping[str, str]): Sections by title.
+        """
+        for section in [key for key in self.sections if key not in text]:
+            self.remove(section)
+        for section, value in text.items():
+            self.update(section, value)
+
+    def unique(self, kind: str) -> str:
+        """Generate label, which is not used yet, nor generated before.
+
+        Args:
+            kind (str): Kind of object, e.g. `figure` or `table`.
+
+        Returns:
+            str: New label, e.g. `fig:3`.
+        """
+        prefix = PREFIXES.get(kind, kind)
+        num = 1
+        while f"{prefix}:{num}" in self.labels \
+                or f"{prefix}:{num}" in self.reserved:
+            num += 1
+        self.reserved.add(f"{prefix}:{num}")
+        return f"{prefix}:{num}"
+
+    def duplicates(self) -> List[str]:
+        """Labels defined more than once."""
+        return sorted(key for key, count in self.labels.items() if count > 1)
+
+    def dangling(self) -> List[str]:
+        """References to labels, which are not defined."""
+        return sorted(key for key in self.refs if key not in self.labels)
+
+    def warnings(self, graphics: Optional[Iterable[str]] = None) -> List[str]:
+        """Problems found in project.
+
+        Args:
+            graphics (Optional[Iterable[str]]): Names of pictures of
+                project, included graphics are not checked if None.
+
+        Returns:
+            List[str]: Description of every problem.
+        """
+        output = [
+            f"Label '{key}' is defined {self.labels[key]} times."
+            for key in self.duplicates()
+        ]
+        output += [
+            f"Reference to undefined label '{key}'."
+            for key in self.dangling()
+        ]
+        if graphics is not None:
+            known = set(graphics)
+            output += [
+                f"Picture '{key}' is not in project."
+                for key in sorted(self.graphics) if key not in known
+            ]
+        return output
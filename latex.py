@@ -4,16 +4,25 @@ main `.tex` file, including:
 
 * Section division,
 * Adding sections and pictures,
-* Exporting file (`.json` to `.tex`).
+* Exporting file (sections to single `.tex`).
 """
-import json
 import os
-from shutil import copyfile
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
 
-from settings import SETTINGS, Sections, settings_path, update_settings
+from blobstore import BlobStore, load_assets, save_assets
+from jobs import Job
+from labels import LabelIndex
+from manifest import ExportManifest
+from packing import PACK_WORKERS, STRATEGIES, PackResult, pack_files
+from search import text_index
+from settings import Sections, settings_path
+from storage import SectionDict, load_sections, save_sections
 from texfigures import LatexFigure
 
+TEX_HEAD = 4096
+
 
 class TexFile:
     """Class representing a Tex file"""
@@ -31,22 +40,25 @@ class TexFile:
         self.title = title
         self.folder_path = path
         self.path = path + "" + title
+        self.store = BlobStore()
+        self.assets = load_assets(path)
         self.text = self.setup()
         self.sections = [
             key for key in self.text.keys()
             if key != Sections.END
         ]
+        self.labels = LabelIndex()
 
     def save(self) -> None:
-        """Save the Tex file to json."""
-        try:
-            with open(self.path, "wt") as file:
-                json.dump(self.text, file, indent=4)
-        except FileNotFoundError:
-            os.mkdir(self.folder_path)
-            with open(self.path, "wt") as file:
-                json.dump(self.text, file, indent=4)
-        update_settings(SETTINGS)
+        """Save sections changed since last save, and index them for
+        search.
+        """
+        changed, order = save_sections(self.path, self.text, self.legacy)
+        self.legacy = False
+        if changed or order is not None:
+            text_index().update(
+                os.path.splitext(self.title)[0], changed, order
+            )
 
     def add_section(self, section: str) -> None:
         """Add section to TeX file.
@@ -65,39 +77,168 @@ class TexFile:
             name (str): name of picture.
             section (str): ): Title of destined section.
         """
-        copyfile(pic, self.folder_path + name)
-        fig = LatexFigure(name)
-        self.text[section] += fig.figure
+        self.store_pic(pic, name)
+        fig = LatexFigure(name, self.new_label("figure"))
+        self.insert(section, fig.figure)
+
+    def insert(
+            self,
+            section: str,
+            snippet: str,
+            offset: Optional[int] = None
+    ) -> None:
+        """Insert snippet into the section.
+
+        Args:
+            section (str): Title of destined section.
+            snippet (str): TeX code to be inserted.
+            offset (Optional[int]): Position in text of section, snippet
+                is appended if it is None.
+        """
+        text = self.text[section]
+        if offset is None:
+            offset = len(text)
+        self.text[section] = text[:offset] + snippet + text[offset:]
 
-    def setup(self) -> Dict[Any, str]:
+    def new_label(self, kind: str) -> str:
+        """Generate label unique in project.
+
+        Args:
+            kind (str): Kind of object, e.g. `figure` or `table`.
+
+        Returns:
+            str: New label.
+        """
+        self.index_labels()
+        return self.labels.unique(kind)
+
+    def index_labels(self) -> None:
+        """Update label index from sections and `.tex` files of project
+        folder, only changed ones are scanned again.
+        """
+        text = dict(self.text)
+        for path in Path(self.folder_path).glob("*.tex"):
+            # labels of longtables written to separate files are in head
+            with open(path, "rt") as file:
+                text[path.name] = file.read(TEX_HEAD)
+        self.labels.sync(text)
+
+    def check_labels(self) -> List[str]:
+        """Find duplicated labels, dangling references and pictures,
+        which are not in project.
+
+        Returns:
+            List[str]: Description of every problem.
+        """
+        self.index_labels()
+        files = [
+            file.name for file in Path(self.folder_path).glob("*")
+            if file.is_file()
+        ] + list(self.assets)
+        return self.labels.warnings(
+            files + [os.path.splitext(name)[0] for name in files]
+        )
+
+    def store_pics(
+            self,
+            pics: List[Tuple[str, str]],
+            job: Optional[Job] = None,
+            workers: int = PACK_WORKERS
+    ) -> int:
+        """Add pictures to the blob store on a thread pool, references
+        of project are saved once, safe to call from background job.
+
+        Args:
+            pics (List[Tuple[str, str]]): Pairs of path and name of
+                picture.
+            job (Optional[Job]): Background job running the storing.
+            workers (int): Number of threads.
+
+        Returns:
+            int: Number of copied pictures, the rest was already stored.
+        """
+        def work(pic: str) -> Tuple[str, bool]:
+            if job is not None:
+                job.check()
+            return self.store.put(pic)
+
+        copied = 0
+        with ThreadPoolExecutor(workers) as pool:
+            futures = [pool.submit(work, pic) for pic, _ in pics]
+            try:
+                for done, (future, (_, name)) in enumerate(
+                        zip(futures, pics), 1):
+                    digest, new = future.result()
+                    self.assets[name] = digest
+                    copied += new
+                    if job is not None:
+                        job.report(done, len(pics))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                save_assets(self.folder_path, self.assets)
+        return copied
+
+    def store_pic(self, pic: str, name: str) -> bool:
+        """Add picture to the blob store and refer to it from project,
+        it is safe to call from background job.
+
+        Args:
+            pic (str): path to picture.
+            name (str): name of picture.
+
+        Returns:
+            bool: False if same picture was already stored.
+        """
+        digest, copied = self.store.put(pic)
+        self.assets[name] = digest
+        save_assets(self.folder_path, self.assets)
+        return copied
+
+    def setup(self) -> SectionDict:
         """Setup of initial state of TeX file.
 
         Returns:
-            Dict[Any, str]: Dictionary-style representation of TeX file.
+            SectionDict: Dictionary-style representation of TeX file.
         """
         temp_1 = {}
         with open(settings_path + "/start.txt", "rt") as file:
             temp_1[Sections.PREAMBLE] = file.read()
-        try:
-            with open(self.path, "rt") as file:
-                temp_2 = json.load(file)
-        except FileNotFoundError:
-            temp_2 = {}
+        temp_2, self.legacy = load_sections(self.path)
         if Sections.INTRO not in temp_2.keys():
             temp_1[Sections.INTRO] = "Some kind of text"
-        output = {**temp_1, **temp_2, Sections.END: "\\end{document}"}
+        output = SectionDict(
+            {**temp_1, **temp_2, Sections.END: "\\end{document}"}
+        )
+        output.mark_dirty(
+            [key for key in output if temp_2.get(key) != output[key]],
+            layout=list(output) != list(temp_2)
+        )
         return output
 
-    def export(self, path: str) -> None:
-        """Export TeX file to folder at given path.
+    def export(
+            self,
+            path: str,
+            job: Optional[Job] = None,
+            strategy: str = STRATEGIES[0]
+    ) -> List[PackResult]:
+        """Export TeX file to folder at given path. Folder exported
+        before is updated, only changed files are rewritten.
 
         Args:
             path (str)): path to export
+            job (Optional[Job]): Background job running the export.
+            strategy (str): First packing method to be tried.
+
+        Returns:
+            List[PackResult]: Timings of packed files.
         """
-        os.remove(path)
-        os.mkdir(path)
-        with open(self.path, "rt") as file:
-            text_dict = json.load(file)
+        if os.path.isfile(path):
+            os.remove(path)
+        os.makedirs(path, exist_ok=True)
+        text_dict = dict(self.text)
 
         text = ""
         for key in text_dict.keys():
@@ -108,5 +249,65 @@ class TexFile:
                 continue
             text += f"\n\\section{{{key}}}\n" + text_dict[key]
         text += "\n" + text_dict[Sections.END]
-        with open(path+"/main.tex", "wt") as file:
-            file.write(text)
+        if job is not None:
+            job.check()
+        manifest = ExportManifest(path)
+        try:
+            if manifest.text_changed("main.tex", text):
+                with open(path+"/main.tex", "wt") as file:
+                    file.write(text)
+                manifest.mark_exported("main.tex")
+            return self.pack_figs(path, manifest, job, strategy)
+        finally:
+            manifest.save()
+
+    def pack_figs(
+            self,
+            path: str,
+            manifest: ExportManifest,
+            job: Optional[Job] = None,
+            strategy: str = STRATEGIES[0]
+    ) -> List[PackResult]:
+        """Pack all picture files to **compilation** folder, pack only
+        files changed since last export. Pictures are taken from the
+        blob store, files put in the project folder by hand too. Blobs
+        are shared by projects, so they are never hardlinked.
+
+        Args:
+            path (str): path to **compilation** folder.
+            manifest (ExportManifest): Manifest of **compilation**
+                folder.
+            job (Optional[Job]): Background job running the packing.
+            strategy (str): First packing method to be tried.
+
+        Returns:
+            List[PackResult]: Timings of packed files.
+        """
+        files = {
+            file.name: str(file)
+            for file in Path(self.folder_path).glob("*")
+            if file.suffix != ".json" and file.is_file()
+        }
+        for name, digest in self.assets.items():
+            files[name] = self.store.path(digest)
+        # pictures with same content share one blob
+        blobs = {self.store.path(digest) for digest in self.assets.values()}
+
+        def skip(source: str, target: str) -> bool:
+            if manifest.file_changed(os.path.basename(target), source):
+                return False
+            # hardlink to blob left by older export is replaced
+            return source not in blobs or not os.path.exists(target) \
+                or not os.path.samefile(source, target)
+
+        results = pack_files(
+            [(source, path + "/" + name) for name, source in files.items()],
+            strategy,
+            job,
+            skip=skip,
+            no_link=blobs
+        )
+        for result in results:
+            manifest.mark_exported(result.name)
+        manifest.remove_stale(["main.tex", *files])
+        return results
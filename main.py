@@ -1,36 +1,74 @@
 """Author Szymon Lasota, Aleksandra Supeł
-This module is responsible for creating both windows (menu and project
-view) and switching between them, also provides function to adding new
-projects.
+This module is responsible for creating root window of the app and
+switching between its views (menu and project view), also provides
+function to adding new projects.
 """
 import os
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
 from tkinter import messagebox as msg
 
-from customtkinter import (CTkToplevel, set_appearance_mode,
+from customtkinter import (CTk, CTkToplevel, set_appearance_mode,
                            set_default_color_theme)
 
+import settings
 from pmenu import ProjectMenu
-from pviev import ProjectWindow
-from settings import RUN, SETTINGS, Active, update_settings
+from search import project_index
+from settings import RUN, Active, update_settings
 
 set_default_color_theme("green")
 
 
-class MainGUI:
+class MainGUI(CTk):
+    """Root window of the app, it lives as long as the app and switches
+    between project menu and project view.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, *args, **kwargs) -> None:
         """Initialize the main GUI"""
-        if SETTINGS["current"] is not None:
-            self.active = Active.WINDOW
-            self.window = ProjectWindow(
-                SETTINGS["current"][0],
-                SETTINGS["current"][1],
-                self.new_project,
-                self.reboot
-            )
+        super().__init__(*args, **kwargs)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.window = None
+        if settings.SETTINGS["current"] is not None:
+            self.show_project(*settings.SETTINGS["current"])
         else:
-            self.active = Active.MENU
-            self.window = ProjectMenu(self.new_project, self.open)
+            self.show_menu()
+
+    def clear(self) -> None:
+        """Destroy currently shown view."""
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def show_menu(self) -> None:
+        """Show project menu."""
+        self.clear()
+        self.active = Active.MENU
+        self.title("Project menu")
+        self.geometry(f"{settings.WIDTH}x{settings.HEIGHT}")
+        self.resizable(False, False)
+        self.window = ProjectMenu(self, self.new_project, self.open)
+        self.window.pack(fill="both", expand=True)
+
+    def show_project(self, path: str, title: str) -> None:
+        """Show project view, only data of this project is loaded.
+
+        Args:
+            path (str): Project folder.
+            title (str): Name of project `.json` file.
+        """
+        from pviev import ProjectWindow
+        self.clear()
+        self.active = Active.WINDOW
+        self.title("Project Window")
+        self.geometry(f"{settings.M_WIDTH}x{settings.M_HEIGHT}")
+        self.resizable(True, True)
+        self.window = ProjectWindow(
+            self, path, title, self.new_project, self.reboot
+        )
+        self.window.pack(fill="both", expand=True)
 
     def new_project(self, path: str, top: CTkToplevel) -> None:
         """Create a new project.
@@ -42,7 +80,7 @@ class MainGUI:
         if not path:
             return
 
-        if path in SETTINGS["projects"].keys():
+        if path in settings.SETTINGS["projects"].keys():
             msg.showerror(
                 title="Fatal Error",
                 message="New project name already exists."
@@ -50,21 +88,22 @@ class MainGUI:
             return
 
         top.destroy()
-        self.window.destroy()
 
         try:
             os.mkdir(f"UserData/{path}/")
         except FileExistsError:   # Control flow statement, I am fully
             pass      # aware it is consider as wrong practice
-        SETTINGS["current"] = [f"UserData/{path}/", f"{path}.json"]
-        SETTINGS["projects"][path] = [f"UserData/{path}/", f"{path}.json"]
-        update_settings(SETTINGS)
-        main()
+        settings.SETTINGS["current"] = [f"UserData/{path}/", f"{path}.json"]
+        settings.SETTINGS["projects"][path] = [
+            f"UserData/{path}/", f"{path}.json"
+        ]
+        update_settings(settings.SETTINGS)
+        project_index().add(path)
+        self.show_project(*settings.SETTINGS["current"])
 
     def reboot(self) -> None:
-        """Reboot all project"""
-        self.window.destroy()
-        main()
+        """Go back to project menu."""
+        self.show_menu()
 
     def open(self, title: str) -> None:
         """Open given project.
@@ -72,26 +111,68 @@ class MainGUI:
         Args:
             title (str): Project title to be opened.
         """
-        SETTINGS["current"] = [f"UserData/{title}/", f"{title}.json"]
-        update_settings(SETTINGS)
-        self.window.destroy()
-        main()
+        settings.SETTINGS["current"] = [f"UserData/{title}/", f"{title}.json"]
+        update_settings(settings.SETTINGS)
+        self.show_project(*settings.SETTINGS["current"])
+
+    def close(self) -> None:
+        """Close the app, current view saves its changes."""
+        self.clear()
+        update_settings(settings.SETTINGS)
+        self.destroy()
 
     def run(self) -> None:
-        """Run the active window."""
-        if self.active == Active.MENU:
-            self.window.run()
-        if self.active == Active.WINDOW:
-            self.window.run()
+        """Run the app."""
+        self.mainloop()
 
 
 def main() -> None:
     """Main function, run when __name__ is __main__."""
     if RUN:
-        set_appearance_mode(SETTINGS["mode"])
+        set_appearance_mode(settings.SETTINGS["mode"])
         main_gui = MainGUI()
         main_gui.run()
 
 
+def profile_startup(top: int = 15) -> None:
+    """Report import time of the app, measured with ``-X importtime``
+    in fresh interpreter.
+
+    Args:
+        top (int): Number of slowest imports shown.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True
+    )
+    pattern = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+    imports = []
+    for line in result.stderr.splitlines():
+        match = pattern.match(line)
+        if match is not None:
+            imports.append((int(match[2]), int(match[1]), match[4]))
+    total = sum(self_us for _, self_us, _ in imports)
+    print(f"Startup imports: {len(imports)} modules, {total / 1000:.1f} ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative, self_us, name in sorted(imports, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+    heavy = [
+        name for name in ("pandas", "numpy", "openpyxl")
+        if any(module == name for _, _, module in imports)
+    ]
+    if heavy:
+        print("Imported at startup, should be lazy:", ", ".join(heavy))
+
+
 if __name__ == "__main__":
-    main()
+    parser = ArgumentParser(description="LaTeX file template creator")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report import time of the app instead of running it"
+    )
+    if parser.parse_args().profile_startup:
+        profile_startup()
+    else:
+        main()
@@ -0,0 +1,156 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains ExportManifest class. Manifest is kept in export
+folder and stores content hashes of exported files, so next export
+rewrites or copies only files that changed. New hash is recorded only
+after file was written, failed copy is repeated next time.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable
+
+MANIFEST_NAME = ".manifest.json"
+BLOCK_SIZE = 1 << 20
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of file, read in blocks.
+
+    Args:
+        path (str): Path to file.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of text encoded as utf-8.
+
+    Args:
+        text (str): Text to hash.
+
+    Returns:
+        str: Hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ExportManifest:
+    """Class representing manifest of export folder."""
+
+    def __init__(self, folder: str) -> None:
+        """Constructor of ExportManifest class, loads manifest if
+        folder was exported before.
+
+        Args:
+            folder (str): Export folder.
+        """
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        try:
+            with open(self.path, "rt") as file:
+                self.entries: Dict[str, Dict] = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+        self.staged: Dict[str, Dict] = {}
+
+    def _exported(self, name: str) -> bool:
+        """Whether file recorded in manifest is still in the folder."""
+        return (
+            name in self.entries
+            and os.path.exists(os.path.join(self.folder, name))
+        )
+
+    def text_changed(self, name: str, text: str) -> bool:
+        """Check whether generated file must be rewritten, if so its new
+        hash is recorded by `mark_exported`.
+
+        Args:
+            name (str): Name of file in export folder.
+            text (str): New content of file.
+
+        Returns:
+            bool: True if file must be written.
+        """
+        digest = text_hash(text)
+        if self._exported(name) and self.entries[name]["hash"] == digest:
+            return False
+        self._stage(name, {"hash": digest})
+        return True
+
+    def file_changed(self, name: str, source: str) -> bool:
+        """Check whether file must be copied, if so its new hash is
+        recorded by `mark_exported`. Source is hashed only if its size
+        or modification time changed.
+
+        Args:
+            name (str): Name of file in export folder.
+            source (str): Path to source file.
+
+        Returns:
+            bool: True if file must be copied.
+        """
+        stat = os.stat(source)
+        entry = self.entries.get(name, {})
+        exported = self._exported(name)
+        if (
+            exported
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime") == stat.st_mtime_ns
+        ):
+            return False
+        digest = file_hash(source)
+        new = {"hash": digest, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if exported and entry.get("hash") == digest:
+            self.entries[name] = new
+            return False
+        self._stage(name, new)
+        return True
+
+    def _stage(self, name: str, entry: Dict) -> None:
+        """Keep entry until file is written, old one no longer holds."""
+        self.entries.pop(name, None)
+        self.staged[name] = entry
+
+    def mark_exported(self, name: str) -> None:
+        """Record new hash of file, after it was written.
+
+        Args:
+            name (str): Name of file in export folder.
+        """
+        entry = self.staged.pop(name, None)
+        if entry is not None:
+            self.entries[name] = entry
+
+    def forget(self, name: str) -> None:
+        """Drop file from manifest, so it is written next time.
+
+        Args:
+            name (str): Name of file in export folder.
+        """
+        self.entries.pop(name, None)
+
+    def remove_stale(self, keep: Iterable[str]) -> None:
+        """Remove exported files, that are no longer part of project.
+        Only files recorded in manifest are touched.
+
+        Args:
+            keep (Iterable[str]): Names of files still exported.
+        """
+        for name in set(self.entries) - set(keep):
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+            del self.entries[name]
+
+    def save(self) -> None:
+        """Save manifest to export folder."""
+        with open(self.path, "wt") as file:
+            json.dump(self.entries, file, indent=4)
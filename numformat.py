@@ -0,0 +1,283 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains NumberFormat class, formatting numeric columns of
+tables. Whole columns are rounded and formatted with NumPy at once:
+
+* to given number of significant figures,
+* to fixed number of decimal places per column,
+* together with their uncertainty, rounded to the place of its last
+significant figure,
+* with chosen decimal separator.
+
+Very large and very small values are written in exponent notation, not
+finite values the same way in every column.
+"""
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+EXPONENT_LIMIT = 15  # larger magnitudes or more places use exponent
+
+
+def magnitude(values: np.ndarray) -> np.ndarray:
+    """Decimal exponent of leading digit, 0 for zero and not finite
+    values.
+    """
+    magnitudes = np.zeros(values.shape)
+    mask = np.isfinite(values) & (values != 0)
+    magnitudes[mask] = np.floor(np.log10(np.abs(values[mask])))
+    return magnitudes
+
+
+def round_places(values: np.ndarray, places: np.ndarray) -> np.ndarray:
+    """Round every value to its own number of decimal places, which may
+    be negative. Values too small or too large for rounding to change
+    them are left as they are, so scaling never overflows.
+    """
+    places = np.clip(np.broadcast_to(places, values.shape), -308, None)
+    output = values.copy()
+    mask = np.isfinite(values) & (magnitude(values) + places < 17)
+    # 10 ** places is split in two factors for subnormal values
+    extra = np.clip(places[mask] - 300, 0, None)
+    rest = places[mask] - extra
+    scaled = values[mask] * 10.0 ** extra * 10.0 ** rest
+    rounded = np.round(scaled)
+    # dividing by negative power of ten is not exact, multiplying is
+    output[mask] = np.where(
+        rest < 0, rounded * 10.0 ** -rest, rounded / 10.0 ** rest
+    ) / 10.0 ** extra
+    return output
+
+
+def round_significant(values: np.ndarray, digits: int) -> np.ndarray:
+    """Round values to significant figures.
+
+    Args:
+        values (np.ndarray): Values to be rounded.
+        digits (int): Number of significant figures.
+
+    Returns:
+        np.ndarray: Decimal places of every rounded value, negative for
+            rounding to tens, hundreds etc. Values are rounded in place.
+    """
+    values[:] = round_places(values, digits - 1 - magnitude(values))
+    # rounding may carry to next power of ten, e.g. 9.996 -> 10.0
+    return (digits - 1 - magnitude(values)).astype(int)
+
+
+def format_non_finite(values: np.ndarray, text: np.ndarray) -> np.ndarray:
+    """Write not finite values the same way in every column, missing
+    values are left empty.
+
+    Args:
+        values (np.ndarray): Values of column.
+        text (np.ndarray): Text of every value, changed in place.
+
+    Returns:
+        np.ndarray: Text of every value.
+    """
+    text[np.isnan(values)] = ""
+    text[values == np.inf] = "$\\infty$"
+    text[values == -np.inf] = "$-\\infty$"
+    return text
+
+
+def format_exponent(
+        values: np.ndarray,
+        digits: np.ndarray,
+        decimal: str = "."
+) -> np.ndarray:
+    """Format values in exponent notation of TeX, e.g.
+    ``$1.23 \\times 10^{-20}$``.
+
+    Args:
+        values (np.ndarray): Finite values to be formatted.
+        digits (np.ndarray): Significant figures of every value, more
+            than 16 stands for shortest exact representation.
+        decimal (str): Decimal separator.
+
+    Returns:
+        np.ndarray: Text of every value.
+    """
+    text = np.full(values.shape, "", dtype=object)
+    for num in np.unique(digits):
+        mask = digits == num
+        if num > 16:
+            text[mask] = [
+                np.format_float_scientific(value, unique=True, trim="-")
+                for value in values[mask]
+            ]
+        else:
+            text[mask] = np.char.mod(f"%.{num - 1}e", values[mask])
+    for num, value in enumerate(text):
+        mantissa, exponent = value.split("e")
+        text[num] = (
+            f"${mantissa.replace('.', decimal)} \\times "
+            + f"10^{{{int(exponent)}}}$"
+        )
+    return text
+
+
+def format_fixed(
+        values: np.ndarray,
+        places: np.ndarray,
+        decimal: str = "."
+) -> np.ndarray:
+    """Format values with given decimal places. Values, which would need
+    more than `EXPONENT_LIMIT` digits before or after decimal point, are
+    written in exponent notation.
+
+    Args:
+        values (np.ndarray): Values to be formatted.
+        places (np.ndarray): Decimal places of every value, negative
+            ones are written as no places.
+        decimal (str): Decimal separator.
+
+    Returns:
+        np.ndarray: Text of every value.
+    """
+    text = np.full(values.shape, "", dtype=object)
+    finite = np.isfinite(values)
+    magnitudes = magnitude(values)
+    exponent = finite & (values != 0) & (
+        (magnitudes >= EXPONENT_LIMIT) | (places > EXPONENT_LIMIT)
+    )
+    fixed = finite & ~exponent
+    for place in np.unique(places[fixed]):
+        mask = fixed & (places == place)
+        text[mask] = np.char.mod(f"%.{max(place, 0)}f", values[mask])
+    if decimal != "." and fixed.any():
+        text[fixed] = np.char.replace(
+            text[fixed].astype(str), ".", decimal
+        )
+    text[exponent] = format_exponent(
+        values[exponent],
+        np.clip(magnitudes[exponent] + places[exponent] + 1, 1, 17)
+        .astype(int),
+        decimal
+    )
+    return format_non_finite(values, text)
+
+
+class NumberFormat:
+    """Formatting of numeric columns of data frame."""
+
+    def __init__(
+            self,
+            digits: Optional[int] = None,
+            precision: Optional[Mapping[str, int]] = None,
+            errors: Optional[Mapping[str, str]] = None,
+            decimal: str = ".",
+            error_digits: int = 2
+    ) -> None:
+        """Constructor of NumberFormat class.
+
+        Args:
+            digits (Optional[int]): Significant figures of floating
+                point columns, they are not rounded if None.
+            precision (Optional[Mapping[str, int]]): Decimal places of
+                columns, by name, used instead of `digits`.
+            errors (Optional[Mapping[str, str]]): Column of uncertainty
+                of value column, by name of value column. Both are
+                written in value column as ``$value \\pm error$``.
+            decimal (str): Decimal separator.
+            error_digits (int): Significant figures of uncertainties.
+        """
+        self.digits = digits
+        self.precision = precision or {}
+        self.errors = errors or {}
+        self.decimal = decimal
+        self.error_digits = error_digits
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Format numeric columns of the frame as text.
+
+        Args:
+            df (pd.DataFrame): Data of table.
+
+        Returns:
+            pd.DataFrame: Frame with formatted columns, uncertainty
+                columns are merged into their value columns.
+        """
+        error_columns = set(self.errors.values())
+        output = {}
+        for column in df.columns:
+            if column in error_columns:
+                continue
+            series = df[column]
+            if column in self.errors:
+                output[column] = self.uncertainty(
+                    column, series, df[self.errors[column]]
+                )
+            elif series.dtype.kind == "f" or (
+                    series.dtype.kind in "iu" and column in self.precision):
+                output[column] = self.column(column, series)
+            else:
+                output[column] = series
+        return pd.DataFrame(output, index=df.index)
+
+    def column(self, name: str, series: pd.Series) -> np.ndarray:
+        """Format numeric column.
+
+        Args:
+            name (str): Name of column.
+            series (pd.Series): Values of column.
+
+        Returns:
+            np.ndarray: Text of every value.
+        """
+        values = series.to_numpy(dtype=float, na_value=np.nan, copy=True)
+        if name in self.precision:
+            places = np.full(values.shape, self.precision[name])
+            values = np.round(values, self.precision[name])
+        elif self.digits is not None:
+            places = round_significant(values, self.digits)
+        else:
+            text = series.to_numpy().astype(str).astype(object)
+            if self.decimal != "." and len(text):
+                text = np.char.replace(
+                    text.astype(str), ".", self.decimal
+                ).astype(object)
+            return format_non_finite(values, text)
+        return format_fixed(values, places, self.decimal)
+
+    def uncertainty(
+            self,
+            name: str,
+            series: pd.Series,
+            errors: pd.Series
+    ) -> np.ndarray:
+        """Format values with their uncertainties. Uncertainty is
+        rounded to `error_digits` significant figures, value to the same
+        decimal place. Values without known uncertainty are formatted
+        like other columns.
+
+        Args:
+            name (str): Name of column of values.
+            series (pd.Series): Values.
+            errors (pd.Series): Uncertainties of values.
+
+        Returns:
+            np.ndarray: Text of every value.
+        """
+        values = series.to_numpy(dtype=float, na_value=np.nan, copy=True)
+        errors = np.abs(
+            errors.to_numpy(dtype=float, na_value=np.nan, copy=True)
+        )
+        places = self.error_digits - 1 - magnitude(errors)
+        errors = round_places(errors, places)
+        places = self.error_digits - 1 - magnitude(errors)
+        known = np.isfinite(errors) & (errors > 0)
+        values[known] = round_places(values[known], places[known])
+        places = places.astype(int)
+        value_text = format_fixed(values, places, self.decimal)
+        error_text = format_fixed(errors, places, self.decimal)
+        with_error = known & np.isfinite(values)
+        text = np.asarray(self.column(name, series), dtype=object)
+        text[with_error] = [
+            f"${value.strip('$')} \\pm {error.strip('$')}$"
+            for value, error in zip(
+                value_text[with_error], error_text[with_error]
+            )
+        ]
+        return text
@@ -0,0 +1,210 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module is responsible for packing project files into **compilation**
+folder. Files are linked or cloned when file system allows it, and
+copied on a thread pool otherwise. Strategies, from the cheapest:
+
+* hardlink - file is linked, no data is copied,
+* reflink - copy-on-write clone (`FICLONE` or `copy_file_range`),
+* sendfile - copy done by kernel with `os.sendfile`,
+* copy - plain `shutil.copyfile`.
+
+Chosen strategy falls back to the next one, when it is not supported.
+Files shared with other projects, such as blobs, must not be linked,
+otherwise editing the packed file would change all of them.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from shutil import copyfile
+from time import perf_counter
+from typing import (Callable, Collection, Dict, Iterable, List, NamedTuple,
+                    Optional, Tuple)
+
+from jobs import Job
+
+STRATEGIES = ["hardlink", "reflink", "sendfile", "copy"]
+PACK_WORKERS = 8
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+
+
+class PackResult(NamedTuple):
+    """Result of packing single file."""
+    name: str
+    method: str
+    seconds: float
+
+
+def hardlink(source: str, target: str) -> None:
+    """Link target to source."""
+    os.link(source, target)
+
+
+def reflink(source: str, target: str) -> None:
+    """Clone source with copy-on-write, without copying data."""
+    import fcntl
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+        size = os.fstat(src.fileno()).st_size
+        while size > 0:
+            sent = os.copy_file_range(src.fileno(), dst.fileno(), size)
+            if sent == 0:
+                break
+            size -= sent
+
+
+def sendfile(source: str, target: str) -> None:
+    """Copy source with `os.sendfile`, data does not leave kernel."""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src.fileno(), offset, size)
+            if sent == 0:
+                break
+            offset += sent
+
+
+def copy(source: str, target: str) -> None:
+    """Plain copy of source."""
+    copyfile(source, target)
+
+
+METHODS: Dict[str, Callable[[str, str], None]] = {
+    "hardlink": hardlink,
+    "reflink": reflink,
+    "sendfile": sendfile,
+    "copy": copy,
+}
+
+
+def pack_file(source: str, target: str, strategy: str = "hardlink") -> str:
+    """Place source file at target path, using the cheapest method
+    available, starting from chosen strategy.
+
+    Args:
+        source (str): Path to source file.
+        target (str): Path to target file, it is replaced.
+        strategy (str): First method to be tried.
+
+    Raises:
+        ValueError: if strategy is not valid.
+
+    Returns:
+        str: Name of method that succeeded.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError("Invalid packing strategy")
+    for method in STRATEGIES[STRATEGIES.index(strategy):]:
+        try:
+            os.remove(target)
+        except FileNotFoundError:
+            pass
+        if method == "copy":
+            copy(source, target)
+            return method
+        try:
+            METHODS[method](source, target)
+            return method
+        except (OSError, ImportError, AttributeError):
+            continue
+    return "copy"
+
+
+def pack_files(
+        files: Iterable[Tuple[str, str]],
+        strategy: str = "hardlink",
+        job: Optional[Job] = None,
+        skip: Optional[Callable[[str, str], bool]] = None,
+        workers: int = PACK_WORKERS,
+        no_link: Collection[str] = ()
+) -> List[PackResult]:
+    """Pack files on a thread pool.
+
+    Args:
+        files (Iterable[Tuple[str, str]]): Pairs of source and target
+            paths.
+        strategy (str): First method to be tried.
+        job (Optional[Job]): Background job running the packing.
+        skip (Optional[Callable[[str, str], bool]]): Called in worker
+            with source and target, file is not packed if it returns
+            True.
+        workers (int): Number of threads.
+        no_link (Collection[str]): Sources, which are never hardlinked,
+            reflink is tried first instead.
+
+    Returns:
+        List[PackResult]: Timings of packed files, in input order.
+    """
+    def work(source: str, target: str) -> Optional[PackResult]:
+        if job is not None:
+            job.check()
+        start = perf_counter()
+        if skip is not None and skip(source, target):
+            return None
+        method = pack_file(
+            source,
+            target,
+            "reflink" if strategy == "hardlink" and source in no_link
+            else strategy
+        )
+        return PackResult(
+            os.path.basename(target), method, perf_counter() - start
+        )
+
+    files = list(files)
+    results: List[Optional[PackResult]] = [None] * len(files)
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {
+            pool.submit(work, source, target): num
+            for num, (source, target) in enumerate(files)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures)):
+                results[futures[future]] = future.result()
+                if job is not None:
+                    job.report(done + 1, len(files))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return [result for result in results if result is not None]
+
+
+def report(results: List[PackResult]) -> str:
+    """Short summary of packing, shown in status bar.
+
+    Args:
+        results (List[PackResult]): Timings of packed files.
+
+    Returns:
+        str: Number of files, total time and files packed by each
+            method, e.g. ``packed 3 files in 1.20 ms (hardlink 2)``.
+    """
+    total = sum(result.seconds for result in results)
+    methods = Counter(result.method for result in results)
+    text = f"packed {len(results)} files in {total * 1000:.2f} ms"
+    if methods:
+        text += " (" + ", ".join(
+            f"{method} {methods[method]}"
+            for method in STRATEGIES if method in methods
+        ) + ")"
+    return text
+
+
+def details(results: List[PackResult]) -> List[str]:
+    """Method and time of every packed file.
+
+    Args:
+        results (List[PackResult]): Timings of packed files.
+
+    Returns:
+        List[str]: Line for every file, e.g. ``fig.png: reflink, 0.12 ms``.
+    """
+    return [
+        f"{result.name}: {result.method}, {result.seconds * 1000:.2f} ms"
+        for result in results
+    ]
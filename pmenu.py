@@ -2,21 +2,29 @@
 This module is responsible for creating menu, that allows user to select
 and create projects.
 """
-import sys
-from typing import Callable
 from shutil import rmtree
+from tkinter import Event
+from typing import Callable
 
-from customtkinter import CTk, CTkButton, CTkFrame, CTkLabel, CTkToplevel
+from customtkinter import (CTk, CTkButton, CTkEntry, CTkFrame, CTkLabel,
+                           CTkToplevel)
 
-from settings import HEIGHT, SETTINGS, WIDTH, get_percent, update_settings
+import settings
+from search import project_index, text_index
+from settings import get_percent, update_settings
 from toplevel import NewProject, SettingsTop
 
+ROWS = 10  # rows of projects list shown at once
+
 
-class ProjectMenu(CTk):
-    """Class representing a project menu."""
+class ProjectMenu(CTkFrame):
+    """Class representing a project menu, shown inside the root window
+    of the app.
+    """
 
     def __init__(
             self,
+            master: CTk,
             new_project: Callable[[str, CTkToplevel], None],
             open_project: Callable[[str], None],
             *args,
@@ -25,29 +33,23 @@ class ProjectMenu(CTk):
         """Constructor of ProjectMenu class.
 
         Args:
+            master (CTk): Root window of the app.
             new_project (Callable[[str, CTkToplevel], None]): Function
                 responsible for creating new project.
             open_project (Callable[[str], None]): function responsible
                 for opening project.
         """
-        super().__init__(*args, **kwargs)
-        self.geometry(f"{WIDTH}x{HEIGHT}")
-        self.title("Project menu")
-        self.protocol("WM_DELETE_WINDOW", self.close)
-        self.resizable(False, False)
-        self.projects = SETTINGS["projects"]
+        super().__init__(
+            master, *args, width=settings.WIDTH, height=settings.HEIGHT,
+            corner_radius=0, **kwargs
+        )
+        self.projects = settings.SETTINGS["projects"]
         self.prj_keys = list(self.projects.keys())
         self.start = 0
         self.new_project = new_project
         self.open_project = open_project
         self.create_gui()
 
-    def close(self) -> None:
-        """Close the app."""
-        update_settings(SETTINGS)
-        self.destroy()
-        sys.exit()
-
     def create_gui(self) -> None:
         """Create whole GUI"""
         self.create_leftframe()
@@ -57,8 +59,8 @@ class ProjectMenu(CTk):
         """Create left frame of the menu."""
         frame = CTkFrame(
             self,
-            width=WIDTH//6,
-            height=HEIGHT
+            width=settings.WIDTH//6,
+            height=settings.HEIGHT
         )
         frame.place(x=0, y=0)
 
@@ -74,21 +76,38 @@ class ProjectMenu(CTk):
             text="Settings",
             command=self.settings
         )
-        settings_button.place(x=10, y=get_percent(HEIGHT, 7))
+        settings_button.place(x=10, y=get_percent(settings.HEIGHT, 7))
 
         next_button = CTkButton(
             frame,
             text="Next page",
             command=self.next
         )
-        next_button.place(x=10, y=get_percent(HEIGHT, 14))
+        next_button.place(x=10, y=get_percent(settings.HEIGHT, 14))
 
         previous_button = CTkButton(
             frame,
             text="Previous page",
             command=self.previous
         )
-        previous_button.place(x=10, y=get_percent(HEIGHT, 19))
+        previous_button.place(x=10, y=get_percent(settings.HEIGHT, 19))
+
+        search_label = CTkLabel(frame, text="Search project")
+        search_label.place(x=10, y=get_percent(settings.HEIGHT, 26))
+
+        self.search_entry = CTkEntry(frame)
+        self.search_entry.place(x=10, y=get_percent(settings.HEIGHT, 30))
+        self.search_entry.bind("<KeyRelease>", lambda _: self.search())
+
+    def search(self) -> None:
+        """Show projects matching the search box, as user types."""
+        query = self.search_entry.get().strip()
+        if query:
+            self.prj_keys = project_index().search(query)
+        else:
+            self.prj_keys = list(self.projects.keys())
+        self.start = 0
+        self.refresh()
 
     def settings(self) -> None:
         """Show settings window."""
@@ -99,41 +118,65 @@ class ProjectMenu(CTk):
         NewProject(self.new_project)
 
     def create_main_frame(self) -> None:
-        """Create main frame of the menu."""
+        """Create main frame of the menu with fixed pool of rows, rows
+        are rebound to projects by `refresh`, never recreated.
+        """
         frame = CTkFrame(
             self,
-            width=5*WIDTH//6,
-            height=HEIGHT
-        )
-        frame.place(x=WIDTH//6, y=0)
-
-        items = zip(
-            range(len(self.prj_keys)), range(self.start, self.start + 10)
+            width=5*settings.WIDTH//6,
+            height=settings.HEIGHT
         )
-        for num, i in items:
-            try:
-                key = self.prj_keys[i]
-            except IndexError:
-                break
-            CTkLabel(frame, text=key, height=50).place(
-                x=10, y=10+num*50
-            )
-
-            CTkButton(
+        frame.place(x=settings.WIDTH//6, y=0)
+        root = self.winfo_toplevel()
+        root.bind("<MouseWheel>", self.scroll)
+        root.bind("<Button-4>", lambda _: self.move(-1))
+        root.bind("<Button-5>", lambda _: self.move(1))
+
+        self.visible = []
+        self.rows = []
+        for num in range(ROWS):
+            label = CTkLabel(frame, text="", height=50)
+            remove = CTkButton(
                 frame,
                 text="Remove",
-                command=lambda num=i: self.rm_project(
-                    self.prj_keys[num]
-                )
-            ).place(x=3*WIDTH//6, y=10+num*50)
-
-            CTkButton(
+                command=lambda num=num: self.rm_project(self.visible[num])
+            )
+            open_ = CTkButton(
                 frame,
                 text="Open",
-                command=lambda num=i: self.open_project(
-                    self.prj_keys[num]
-                )
-            ).place(x=4*WIDTH//6, y=10+num*50)
+                command=lambda num=num: self.open_project(self.visible[num])
+            )
+            self.rows.append((label, remove, open_))
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Bind rows of the list to projects from current position."""
+        self.visible = self.prj_keys[self.start:self.start + ROWS]
+        for num, (label, remove, open_) in enumerate(self.rows):
+            if num >= len(self.visible):
+                label.place_forget()
+                remove.place_forget()
+                open_.place_forget()
+                continue
+            label.configure(text=self.visible[num])
+            label.place(x=10, y=10+num*50)
+            remove.place(x=3*settings.WIDTH//6, y=10+num*50)
+            open_.place(x=4*settings.WIDTH//6, y=10+num*50)
+
+    def scroll(self, event: Event) -> None:
+        """Scroll the list with mouse wheel."""
+        self.move(-1 if event.delta > 0 else 1)
+
+    def move(self, rows: int) -> None:
+        """Move the list by given number of rows.
+
+        Args:
+            rows (int): Rows to move, negative moves up.
+        """
+        self.start = max(
+            0, min(self.start + rows, len(self.prj_keys) - ROWS)
+        )
+        self.refresh()
 
     def rm_project(self, key: str) -> None:
         """Remove project.
@@ -141,29 +184,36 @@ class ProjectMenu(CTk):
         Args:
             key (str): Project to be removed.
         """
-        rmtree(SETTINGS["projects"][key][0])
-        del SETTINGS["projects"][key]
-        update_settings(SETTINGS)
-        self.projects = SETTINGS["projects"]
-        self.prj_keys = list(self.projects.keys())
-        self.create_main_frame()
+        rmtree(settings.SETTINGS["projects"][key][0])
+        del settings.SETTINGS["projects"][key]
+        update_settings(settings.SETTINGS)
+        project_index().remove(key)
+        text_index().remove(key)
+        self.projects = settings.SETTINGS["projects"]
+        if key in self.prj_keys:
+            self.prj_keys.remove(key)
+        self.start = min(self.start, max(0, len(self.prj_keys) - 1))
+        self.refresh()
 
     def next(self) -> None:
         """Show nex page of the projects list."""
-        self.start += 10
+        self.start += ROWS
         try:
             self.prj_keys[self.start]
         except IndexError:
             self.start = 0
-        self.create_main_frame()
+        self.refresh()
 
     def previous(self) -> None:
         """Shows previous page of the projects list."""
-        self.start -= 10
+        self.start -= ROWS
         if self.start < 0:
             self.start = 0
-        self.create_main_frame()
-
-    def run(self) -> None:
-        """Run the menu."""
-        self.mainloop()
+        self.refresh()
+
+    def destroy(self) -> None:
+        """Destroy the menu, with its bindings on root window."""
+        root = self.winfo_toplevel()
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            root.unbind(sequence)
+        super().destroy()
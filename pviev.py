@@ -7,27 +7,26 @@ own math equations (save them for later and then reuse it). There is
 easy access to all sections including the preamble which contains
 predefined packages.
 """
+from __future__ import annotations
 
 import os
 import platform
 import subprocess
-import sys
-from pathlib import Path
-from shutil import copyfile
-from tkinter import Menu
+from queue import Empty, Queue
+from tkinter import Event, EventType, Menu
 from tkinter import filedialog as fd
 from tkinter import messagebox as msg
 from traceback import print_exc
-from typing import Callable
+from typing import (TYPE_CHECKING, Callable, ContextManager, Iterable, List,
+                    Optional)
 
-import pandas as pd
 # Font option is available only for customtkinter in version 5.0.3 or
 # later, if your version is older than that GUI will be displayed with
 # default tkinter font.
 # WARNING: if during installation something fails,
 # we recommend changing version of customtkinter in `requirements.txt`
 # from 5.0.3 to 4.6.3, then reinstall requirements.txt.
-from customtkinter import (END, INSERT, CTk, CTkButton, CTkEntry, CTkFrame,
+from customtkinter import (INSERT, CTk, CTkButton, CTkEntry, CTkFrame,
                            CTkLabel, CTkOptionMenu, CTkTextbox, CTkToplevel,
                            StringVar)
 
@@ -43,17 +42,33 @@ except ImportError:
             + "that your program will use normal (default) font for tkinter."
         )
 
+import settings
+from autosave import AutoSaver
+from compiler import DEFAULT_COMPILER, CompileService
+from editor import (LARGE_SECTION, EditorCache, WindowedBuffer,
+                    text_widget)
+from highlight import TextHighlighter
+from jobs import POLL_MS, Job, JobScheduler
 from latex import TexFile
-from settings import (M_HEIGHT, M_WIDTH, PADDING, SETTINGS, Mode, Sections,
+from packing import STRATEGIES, PackResult, details, report
+from search import project_index, text_index
+from settings import (PADDING, PICTURE_EXTENSIONS, Mode, Sections,
                       get_percent, help_file, update_settings)
-from texfigures import LatexMath, LatexTable
-from toplevel import EnterMath, EnterTable, NewProject, SettingsTop
+from texfigures import LatexFigure, LatexLongTable, LatexMath, LatexTable
+from toplevel import EnterTables, NewProject, SearchTop, SettingsTop
 
+if TYPE_CHECKING:  # pandas is imported when first table is added
+    import pandas as pd
 
-class ProjectWindow(CTk):
-    """Main project window."""
+    from datafiles import TableBatch, TableResult
+    from numformat import NumberFormat
+
+
+class ProjectWindow(CTkFrame):
+    """Main project view, shown inside the root window of the app."""
     def __init__(
             self,
+            master: CTk,
             path_project: str,
             title: str,
             new_project: Callable[[str, CTkToplevel], None],
@@ -64,42 +79,57 @@ class ProjectWindow(CTk):
         """Constructor of main project window.
 
         Args:
+            master (CTk): Root window of the app.
             path_project (str): path to temporary project files.
             title (str): title of the project.
             new_project (Callable): Method creates new project window.
+            reboot (Callable): Method showing project menu.
             *args
             **kwargs
         """
-        super().__init__(*args, **kwargs)
+        super().__init__(
+            master, *args, width=settings.M_WIDTH, height=settings.M_HEIGHT,
+            corner_radius=0, **kwargs
+        )
         self.entry = Sections.INTRO
         self.project_path = path_project
         self.new_project = new_project
         self.reboot = reboot
         self.active_section = Sections.PREAMBLE
-        self.title("Project Window")
-        self.geometry(f"{M_WIDTH}x{M_HEIGHT}")
+        self.left_frame = None
+        self.main_frame = None
+        self.menubar = None
+        self.compile_after = None
         try:
             self.font = CTkFont(
                         family="Consolas", size=12, weight="normal"
                 )
         except NameError:
             self.font = None
-        self.protocol("WM_DELETE_WINDOW", self.close)
         self.tex_file = TexFile(path=path_project, title=title)
+        self.jobs = JobScheduler(self)
+        self.autosave = AutoSaver(self.tex_file.save)
+        self.compiler = CompileService(
+            settings.SETTINGS.get("compiler", DEFAULT_COMPILER)
+        )
+        self.compiled: Queue = Queue()
+        self.compile_polling = False
+        self.compile_wanted = False
+        self.export_path: Optional[str] = None
+        self.packed: List[PackResult] = []
         self.create_gui()
 
-    def close(self) -> None:
-        """Method for closing the window."""
-        self.save()
-        self.destroy()
-        sys.exit()
-
     def create_gui(self) -> None:
-        """Method for creating a new window."""
-        left_frame = self.left_frame_setup()
-        left_frame.place(x=0, y=0)
-        main_frame = self.mainframe_setup()
-        main_frame.place(x=M_WIDTH//3, y=0)
+        """Method for creating a new window. Called again, it rebuilds
+        left frame only, so section editors are kept.
+        """
+        if self.left_frame is not None:
+            self.left_frame.destroy()
+        self.left_frame = self.left_frame_setup()
+        self.left_frame.place(x=0, y=0)
+        if self.main_frame is None:
+            self.main_frame = self.mainframe_setup()
+            self.main_frame.place(x=settings.M_WIDTH//3, y=0)
         self.menu_setup()
 
     def mainframe_setup(self) -> CTkFrame:
@@ -110,34 +140,254 @@ class ProjectWindow(CTk):
         """
         main_frame = CTkFrame(
             self,
-            width=M_WIDTH//3 * 2,
-            height=M_HEIGHT-PADDING
+            width=settings.M_WIDTH//3 * 2,
+            height=settings.M_HEIGHT-PADDING
         )
-
-        self.entry = CTkTextbox(
-            main_frame,
-            width=int(M_WIDTH//3 * 2),
-            height=M_HEIGHT-PADDING,
-            font=self.font
-        )
-        self.entry.place(x=0, y=0)
-        self.entry.insert(
-            INSERT, self.tex_file.text[self.active_section]
+        self.main_frame = main_frame
+        self.editors = EditorCache(self.create_editor, self.sync_editor)
+        self.entry = self.editors.show(
+            self.active_section,
+            len(self.tex_file.text[self.active_section])
         )
 
         return main_frame
 
+    def create_editor(self, section: str) -> CTkTextbox:
+        """Create editor of the section, it has its own cursor, scroll
+        position, undo history and highlighting. Only window of large
+        section is loaded, with long environments folded.
+
+        Args:
+            section (str): Section to be edited.
+
+        Returns:
+            CTkTextbox: Editor filled with text of section.
+        """
+        editor = CTkTextbox(
+            self.main_frame,
+            width=int(settings.M_WIDTH//3 * 2),
+            height=settings.M_HEIGHT-PADDING,
+            font=self.font,
+            undo=True
+        )
+        text = text_widget(editor)
+        content = self.tex_file.text[section]
+        editor.buffer = None
+        if len(content) > LARGE_SECTION:
+            editor.buffer = WindowedBuffer(content)
+            content = editor.buffer.window
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>",
+                             "<KeyRelease>"):
+                text.bind(
+                    sequence,
+                    lambda _: self.after_idle(self.page, section),
+                    add="+"
+                )
+            text.bind("<Double-Button-1>", lambda _: self.unfold(section))
+            for sequence in ("<KeyPress>", "<<Cut>>", "<<Paste>>",
+                             "<<Clear>>"):
+                text.bind(
+                    sequence,
+                    lambda event: self.guard_folds(section, event),
+                    add="+"
+                )
+        text.insert(INSERT, content)
+        text.edit_reset()
+        text.edit_modified(False)
+        editor.highlighter = TextHighlighter(text)
+        return editor
+
+    def sync_editor(self, section: str, editor: CTkTextbox) -> None:
+        """Write text of editor to the section, if it was modified.
+
+        Args:
+            section (str): Section of editor.
+            editor (CTkTextbox): Editor of the section.
+        """
+        text = text_widget(editor)
+        if not text.edit_modified():
+            return
+        content = text.get(1.0, "end-1c")
+        if editor.buffer is not None:
+            try:
+                editor.buffer.commit(content)
+            except ValueError as error:
+                # section is kept as it was, until placeholder is restored
+                msg.showerror(title=section, message=str(error))
+                return
+            content = editor.buffer.text()
+        self.tex_file.text[section] = content
+        text.edit_modified(False)
+        self.editors.resize(section, len(self.tex_file.text[section]))
+        self.autosave.mark_dirty()
+
+    def insert_snippet(self, section: str, snippet: str) -> None:
+        """Insert snippet at cursor of the section editor, only inserted
+        range of editor and model is touched. Snippet is appended to
+        the section, if its editor is not cached.
+
+        Args:
+            section (str): Destined section.
+            snippet (str): TeX code to be inserted.
+        """
+        editor = self.editors.get(section)
+        if editor is None:
+            self.tex_file.insert(section, snippet)
+            self.autosave.mark_dirty()
+            return
+        text = text_widget(editor)
+        synced = not text.edit_modified() and editor.buffer is None
+        if synced:
+            count = text.count("1.0", INSERT, "chars")
+        text.edit_separator()
+        text.insert(INSERT, snippet)
+        text.edit_separator()
+        text.see(INSERT)
+        if synced:
+            # editor and model are equal, so they are changed in place
+            self.tex_file.insert(section, snippet, count[0] if count else 0)
+            text.edit_modified(False)
+            self.editors.resize(section, len(self.tex_file.text[section]))
+        self.autosave.mark_dirty()
+
+    def search(self) -> None:
+        """Open window of search in all projects."""
+        self.save_now()
+        SearchTop(self.jobs, self)
+
+    def new_label(self, kind: str) -> str:
+        """Generate label unique in project, for object to be inserted.
+
+        Args:
+            kind (str): Kind of object, e.g. `figure` or `table`.
+
+        Returns:
+            str: New label.
+        """
+        self.save()
+        return self.tex_file.new_label(kind)
+
+    def check_labels(self) -> None:
+        """Show duplicated labels, dangling references and missing
+        pictures.
+        """
+        self.save()
+        warnings = self.tex_file.check_labels()
+        if not warnings:
+            msg.showinfo(title="Labels", message="No problems found.")
+            return
+        msg.showwarning(title="Labels", message="\n".join(warnings))
+
+    def page(self, section: str) -> None:
+        """Load another window of large section, when editor is
+        scrolled close to edge of loaded one.
+
+        Args:
+            section (str): Windowed section.
+        """
+        editor = self.editors.get(section)
+        if editor is None:
+            return
+        buffer = editor.buffer
+        text = text_widget(editor)
+        top, bottom = text.yview()
+        if not (top < 0.1 and not buffer.at_top()
+                or bottom > 0.9 and not buffer.at_bottom()):
+            return
+        first = buffer.start + int(text.index("@0,0").split(".")[0]) - 1
+        modified = text.edit_modified()
+        try:
+            buffer.commit(text.get(1.0, "end-1c"))
+        except ValueError:
+            return
+        text.delete(1.0, "end")
+        text.insert(1.0, buffer.move(first))
+        line = f"{first - buffer.start + 1}.0"
+        text.mark_set(INSERT, line)
+        text.yview(line)
+        # undo history does not survive moving the window
+        text.edit_reset()
+        text.edit_modified(modified)
+        editor.highlighter.reset()
+
+    def guard_folds(self, section: str, event: Event) -> Optional[str]:
+        """Block edits touching placeholders of folded blocks, they can
+        only be unfolded.
+
+        Args:
+            section (str): Windowed section.
+            event (Event): Key press, cut, paste or clear event.
+
+        Returns:
+            Optional[str]: "break" if edit was blocked.
+        """
+        editor = self.editors.get(section)
+        if editor is None:
+            return None
+        text = text_widget(editor)
+        key = event.keysym if event.type == EventType.KeyPress else None
+        if key is not None and (
+                not event.char and key not in ("BackSpace", "Delete")
+                or event.state & 0x4):  # navigation or Control shortcut
+            return None
+        first = last = int(text.index(INSERT).split(".")[0])
+        if text.tag_ranges("sel"):
+            first = int(text.index("sel.first").split(".")[0])
+            last = int(text.index("sel.last").split(".")[0])
+        elif key == "BackSpace" \
+                and text.compare(INSERT, "==", "insert linestart"):
+            first -= 1
+        elif key == "Delete" and text.compare(INSERT, "==", "insert lineend"):
+            last += 1
+        if not any(
+                editor.buffer.is_placeholder(
+                    text.get(f"{num}.0", f"{num}.0 lineend")
+                )
+                for num in range(max(first, 1), last + 1)):
+            return None
+        self.status.configure(text="Double-click folded block to unfold it")
+        return "break"
+
+    def unfold(self, section: str) -> Optional[str]:
+        """Expand folded block under the mouse pointer.
+
+        Args:
+            section (str): Windowed section.
+
+        Returns:
+            Optional[str]: "break" if block was expanded.
+        """
+        editor = self.editors.get(section)
+        if editor is None:
+            return None
+        text = text_widget(editor)
+        start = text.index("current linestart")
+        body = editor.buffer.unfold(text.get(start, f"{start} lineend"))
+        if body is None:
+            return None
+        modified = text.edit_modified()
+        text.delete(start, f"{start} lineend")
+        text.insert(start, body)
+        text.edit_modified(modified)
+        return "break"
+
     def menu_setup(self) -> None:
         """Set up the menubar for project window."""
-        menubar = Menu(self, background="#000000")
+        if self.menubar is not None:
+            self.menubar.destroy()
+        menubar = Menu(self.winfo_toplevel(), background="#000000")
+        self.menubar = menubar
 
         file = Menu(menubar, tearoff=0, bg="#4e4e4e", fg="#ffffff")
         file.add_command(label="New", command=self.new)
         file.add_command(label="Close project", command=self.close_project)
         file.add_command(label="Settings", command=self.settings)
-        file.add_command(label="Save", command=self.save)
+        file.add_command(label="Save", command=self.save_now)
         file.add_command(label="Save as...", command=self.save_as)
         file.add_command(label="Export", command=self.export)
+        file.add_command(label="Export report", command=self.export_report)
+        file.add_command(label="Compile", command=self.compile)
+        file.add_command(label="Search projects", command=self.search)
         menubar.add_cascade(label="File", menu=file)
 
         edit = Menu(menubar, tearoff=0,  bg="#4e4e4e", fg="#ffffff")
@@ -145,7 +395,14 @@ class ProjectWindow(CTk):
             label="Add table", command=self.get_table_file
         )
         edit.add_command(
-            label="Add figure", command=self.add_pic
+            label="Add tables from folder",
+            command=lambda: EnterTables(self.import_tables, self)
+        )
+        edit.add_command(
+            label="Add figures", command=self.add_pic
+        )
+        edit.add_command(
+            label="Add figures from folder", command=self.add_pic_folder
         )
         edit.add_command(
             label="Add section", command=self.add_section
@@ -153,6 +410,9 @@ class ProjectWindow(CTk):
         edit.add_command(
             label="Remove current section", command=self.remove_section
         )
+        edit.add_command(
+            label="Check labels", command=self.check_labels
+        )
 
         submenu = Menu(edit, tearoff=0,  bg="#4e4e4e", fg="#ffffff")
         submenu.add_command(
@@ -173,7 +433,7 @@ class ProjectWindow(CTk):
         help_.add_command(label="Instruction", command=self.instruction)
         menubar.add_cascade(label="Help", menu=help_)
 
-        self.config(menu=menubar)
+        self.winfo_toplevel().config(menu=menubar)
 
     def left_frame_setup(self) -> CTkFrame:
         """Left frame setup, left frame contains action buttons and
@@ -185,8 +445,8 @@ class ProjectWindow(CTk):
 
         frame = CTkFrame(
             self,
-            width=M_WIDTH//3,
-            height=M_HEIGHT-PADDING
+            width=settings.M_WIDTH//3,
+            height=settings.M_HEIGHT-PADDING
         )
 
         variable = StringVar(self, self.tex_file.sections[0])
@@ -195,9 +455,9 @@ class ProjectWindow(CTk):
             frame,
             values=self.tex_file.sections,
             variable=variable,
-            width=M_WIDTH//3 - M_WIDTH//30,
+            width=settings.M_WIDTH//3 - settings.M_WIDTH//30,
         )
-        combo_box.place(x=M_WIDTH//60, y=25)
+        combo_box.place(x=settings.M_WIDTH//60, y=25)
 
         button = CTkButton(
             frame,
@@ -205,8 +465,8 @@ class ProjectWindow(CTk):
             command=lambda: self.switch(combo_box.get())
         )
         button.place(
-            x=get_percent(M_WIDTH//3, 10),
-            y=get_percent(M_HEIGHT, 90)
+            x=get_percent(settings.M_WIDTH//3, 10),
+            y=get_percent(settings.M_HEIGHT, 90)
         )
         add_pic_button = CTkButton(
             frame,
@@ -214,8 +474,8 @@ class ProjectWindow(CTk):
             command=self.add_pic
         )
         add_pic_button.place(
-            x=get_percent(M_WIDTH//3, 10),
-            y=get_percent(M_HEIGHT, 85)
+            x=get_percent(settings.M_WIDTH//3, 10),
+            y=get_percent(settings.M_HEIGHT, 85)
         )
         add_table_button = CTkButton(
             frame,
@@ -223,12 +483,50 @@ class ProjectWindow(CTk):
             command=self.get_table_file
         )
         add_table_button.place(
-            x=get_percent(M_WIDTH//3, 10),
-            y=get_percent(M_HEIGHT, 80)
+            x=get_percent(settings.M_WIDTH//3, 10),
+            y=get_percent(settings.M_HEIGHT, 80)
+        )
+
+        self.status = CTkLabel(frame, text="")
+        self.status.place(
+            x=get_percent(settings.M_WIDTH//3, 10),
+            y=get_percent(settings.M_HEIGHT, 70)
+        )
+        cancel_button = CTkButton(
+            frame,
+            text="Cancel tasks",
+            command=self.jobs.cancel_all
+        )
+        cancel_button.place(
+            x=get_percent(settings.M_WIDTH//3, 10),
+            y=get_percent(settings.M_HEIGHT, 75)
         )
 
         return frame
 
+    def show_progress(self, job: Job, done: int, total: int) -> None:
+        """Show progress of the background job.
+
+        Args:
+            job (Job): Reporting job.
+            done (int): Number of finished steps.
+            total (int): Number of all steps, 0 if unknown.
+        """
+        if total:
+            self.status.configure(text=f"{job.name}: {done}/{total}")
+        else:
+            self.status.configure(text=f"{job.name}: {done}")
+
+    def show_error(self, error: BaseException) -> None:
+        """Show error raised by background job.
+
+        Args:
+            error (BaseException): Raised error.
+        """
+        self.status.configure(text="")
+        self.compile_wanted = False
+        msg.showerror(title="Fatal error", message=str(error))
+
     def settings(self) -> None:
         """Open the settings."""
         SettingsTop()
@@ -237,12 +535,8 @@ class ProjectWindow(CTk):
         """Remove section from the project."""
         del self.tex_file.text[self.active_section]
         self.tex_file.sections.remove(self.active_section)
-        self.active_section = self.tex_file.sections[0]
-        try:
-            self.entry.textbox.delete(1.0, END)
-        except AttributeError:
-            self.entry.delete(1.0, END)
-        self.entry.insert(INSERT, self.tex_file.text[self.active_section])
+        self.editors.drop(self.active_section, sync=False)
+        self.switch(self.tex_file.sections[0])
         self.save()
         self.create_gui()
 
@@ -257,24 +551,42 @@ class ProjectWindow(CTk):
             subprocess.call(('xdg-open', help_file))
 
     def save(self) -> None:
-        """Save the file."""
-        try:
-            self.tex_file.text[self.active_section] =\
-                self.entry.textbox.get(1.0, "end-1c")
-        except AttributeError:
-            self.tex_file.text[self.active_section] =\
-                self.entry.get(1.0, "end-1c")
-        self.tex_file.save()
+        """Save the file, writing is done in background shortly after
+        last change. Only modified editors are read.
+        """
+        for section, editor in self.editors.items():
+            self.sync_editor(section, editor)
+        self.editors.evict()
+        self.autosave.mark_dirty()
 
-    def switch(self, section: str) -> None:
-        """Switch between sections."""
+    def save_now(self) -> None:
+        """Save the file immediately."""
         self.save()
+        self.autosave.flush()
+
+    def destroy(self) -> None:
+        """Write pending changes, stop background work and destroy the
+        view together with its menubar.
+        """
+        self.save()
+        self.autosave.close()
+        self.jobs.shutdown()
+        self.compiler.cancel()
+        if self.compile_after is not None:
+            self.after_cancel(self.compile_after)
+        if self.menubar is not None:
+            self.winfo_toplevel().config(menu="")
+            self.menubar.destroy()
+        super().destroy()
+
+    def switch(self, section: str) -> None:
+        """Switch between sections, editor of recently used section is
+        shown as it was left.
+        """
         self.active_section = section
-        try:
-            self.entry.textbox.delete(1.0, END)
-        except AttributeError:
-            self.entry.delete(1.0, END)
-        self.entry.insert(INSERT, self.tex_file.text[section])
+        self.entry = self.editors.show(
+            section, len(self.tex_file.text[section])
+        )
 
     def new(self) -> None:
         """Create new project."""
@@ -282,39 +594,87 @@ class ProjectWindow(CTk):
         NewProject(self.new_project)
 
     def add_pic(self) -> None:
-        """Add picture to current section."""
-
-        path = fd.askopenfilename(
-            title="Open file",
+        """Add pictures chosen by user to current section."""
+        paths = fd.askopenfilenames(
+            title="Open files",
+            filetypes=[
+                ("Pictures", " ".join(
+                    f"*{ext}" for ext in PICTURE_EXTENSIONS
+                )),
+                ("All files", "*"),
+            ]
         )
+        if paths:
+            self.import_pics(list(paths))
 
-        if path is None:
+    def add_pic_folder(self) -> None:
+        """Add all pictures of folder chosen by user to current
+        section.
+        """
+        folder = fd.askdirectory(title="Open folder")
+        if not folder:
             return
-        if not (
-            path.lower().endswith(".jpg")
-            or path.lower().endswith(".pdf")
-            or path.lower().endswith(".png")
-        ):
+        paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if os.path.isfile(os.path.join(folder, name))
+            and name.lower().endswith(PICTURE_EXTENSIONS)
+        )
+        if not paths:
             msg.showerror(
-                title="Wrong file extension",
-                message="Your file must be .pdf, .png, .jpg"
+                title="No pictures",
+                message="Folder contains no .pdf, .png, .jpg files."
             )
             return
+        self.import_pics(paths)
 
-        name = ""
-        for char in path[::-1]:
-            if char == "/":
-                break
-            name += char
-        self.tex_file.add_pic(path, name[::-1], self.active_section)
-        try:
-            self.entry.textbox.delete(1.0, END)
-        except AttributeError:
-            self.entry.delete(1.0, END)
-        self.entry.insert(
-            INSERT, self.tex_file.text[self.active_section]
+    def import_pics(self, paths: List[str]) -> None:
+        """Store pictures in background job, then insert their figures
+        at once.
+
+        Args:
+            paths (List[str]): Paths to pictures.
+        """
+        wrong = [
+            path for path in paths
+            if not path.lower().endswith(PICTURE_EXTENSIONS)
+        ]
+        if wrong:
+            msg.showerror(
+                title="Wrong file extension",
+                message="Your files must be .pdf, .png, .jpg, skipped:\n"
+                + "\n".join(os.path.basename(path) for path in wrong)
+            )
+        pics = [
+            (path, os.path.basename(path)) for path in paths
+            if path not in wrong
+        ]
+        if not pics:
+            return
+        section = self.active_section
+        self.status.configure(text="Copying pictures")
+        self.jobs.submit(
+            "Copying pictures",
+            lambda job: self.tex_file.store_pics(pics, job),
+            on_done=lambda _: self.pics_stored(
+                [name for _, name in pics], section
+            ),
+            on_error=self.show_error,
+            on_progress=self.show_progress
         )
+
+    def pics_stored(self, names: List[str], section: str) -> None:
+        """Insert figures of the pictures stored in background.
+
+        Args:
+            names (List[str]): Names of pictures.
+            section (str): Section active when pictures were chosen.
+        """
+        self.status.configure(text="")
         self.save()
+        self.insert_snippet(section, "".join(
+            LatexFigure(name, self.tex_file.new_label("figure")).figure
+            for name in names
+        ))
 
     def add_section(self) -> None:
         """Get information about a new section of the project."""
@@ -371,51 +731,220 @@ class ProjectWindow(CTk):
         )
         if path is None:
             return
-        EnterTable(path, self.add_table)
+        from toplevel import EnterTable
+        EnterTable(path, self.add_table, self.add_longtable, self.jobs)
 
-    def add_table(self, df: pd.DataFrame) -> None:
+    def add_table(
+            self,
+            df: pd.DataFrame,
+            number_format: Optional[NumberFormat] = None
+    ) -> None:
         """Add the table to the project.
 
         Args:
             df (pd.DataFrame): Dataframe to be converted into tex table.
+            number_format (Optional[NumberFormat]): Formatting of
+                numeric columns.
         """
+        tab = LatexTable(
+            df, self.new_label("table"), number_format=number_format
+        )
+        self.insert_snippet(self.active_section, tab.tex_repr())
+
+    def import_tables(
+            self,
+            paths: List[str],
+            decimal: str,
+            sep: str,
+            digits: Optional[int] = None
+    ) -> None:
+        """Render tables of data files on process pool of scheduler, one
+        job per file, then insert them at once.
+
+        Args:
+            paths (List[str]): Paths to data files, in order of tables.
+            decimal (str): Character separating decimal values.
+            sep (str): Character separating columns of `.csv` files.
+            digits (Optional[int]): Significant figures of numbers.
+        """
+        from datafiles import TableBatch, render_file
         self.save()
-        tab = LatexTable(df)
-        self.tex_file.text[self.active_section] += tab.tex_repr()
-        try:
-            self.entry.textbox.delete(1.0, END)
-        except AttributeError:
-            self.entry.delete(1.0, END)
-        self.entry.insert(
-            INSERT, self.tex_file.text[self.active_section]
+        labels = [self.tex_file.new_label("table") for _ in paths]
+        section = self.active_section
+        batch = TableBatch(
+            paths,
+            lambda results: self.tables_rendered(results, section),
+            lambda: self.status.configure(text="")
         )
+        self.status.configure(text="Reading tables")
+        for num, (path, label) in enumerate(zip(paths, labels)):
+            self.jobs.submit(
+                "Reading tables",
+                render_file,
+                path,
+                decimal,
+                sep,
+                label,
+                digits,
+                on_done=lambda result, num=num: self.table_rendered(
+                    batch, num, result
+                ),
+                on_error=lambda error, num=num: batch.fail(num, error),
+                on_cancel=batch.cancel,
+                process=True
+            )
+
+    def table_rendered(
+            self,
+            batch: TableBatch,
+            num: int,
+            result: TableResult
+    ) -> None:
+        """Collect table rendered in background, show progress.
+
+        Args:
+            batch (TableBatch): Tables being rendered.
+            num (int): Index of file.
+            result (TableResult): Rendered table.
+        """
+        batch.add(num, result)
+        if not batch.cancelled and batch.done < len(batch.paths):
+            self.status.configure(
+                text=f"Reading tables: {batch.done}/{len(batch.paths)}"
+            )
+
+    def tables_rendered(
+            self,
+            results: List[TableResult],
+            section: str
+    ) -> None:
+        """Insert tables rendered in background, show files which were
+        not read.
+
+        Args:
+            results (List[TableResult]): Rendered tables.
+            section (str): Section active when files were chosen.
+        """
+        self.status.configure(text="")
+        tables = "".join(result.tex for result in results)
+        if tables:
+            self.insert_snippet(section, tables)
+        failed = [result for result in results if result.error]
+        if failed:
+            msg.showerror(
+                title="Fatal error",
+                message="Error occurred while reading files:\n"
+                + "\n".join(
+                    f"{result.name}: {result.error}" for result in failed
+                )
+            )
+
+    def add_longtable(
+            self,
+            open_chunks: Callable[[], ContextManager[Iterable[pd.DataFrame]]],
+            number_format: Optional[NumberFormat] = None
+    ) -> None:
+        """Stream the table into separate `.tex` file in the project
+        folder, in background job, and include it in the current
+        section.
+
+        Args:
+            open_chunks (Callable[[], ContextManager[Iterable[
+                pd.DataFrame]]]): Opens reader of consecutive parts of
+                the table, e.g. `read_csv` with `chunksize`.
+            number_format (Optional[NumberFormat]): Formatting of
+                numeric columns.
+        """
         self.save()
+        num = 1
+        while os.path.exists(f"{self.project_path}table{num}.tex"):
+            num += 1
+        name = f"table{num}"
+        section = self.active_section
+        self.jobs.submit(
+            "Writing table",
+            self.write_longtable,
+            open_chunks,
+            f"{self.project_path}{name}.tex",
+            self.new_label("table"),
+            number_format,
+            on_done=lambda _: self.longtable_written(name, section),
+            on_error=lambda error: msg.showerror(
+                title="Fatal error",
+                message=(
+                    "Error occurred while reading file, make sure"
+                    + " you pass correct separators and decimal separator"
+                )
+            ),
+            on_progress=self.show_progress
+        )
+
+    @staticmethod
+    def write_longtable(
+            job: Job,
+            open_chunks: Callable[[], ContextManager[Iterable[pd.DataFrame]]],
+            path: str,
+            label: str,
+            number_format: Optional[NumberFormat] = None
+    ) -> None:
+        """Write longtable to file, run as background job. Reader is
+        always closed, and partial file is removed, if job failed or was
+        cancelled.
+
+        Args:
+            job (Job): Job running the writing.
+            open_chunks (Callable[[], ContextManager[Iterable[
+                pd.DataFrame]]]): Opens reader of consecutive parts of
+                the table.
+            path (str): Path of `.tex` file.
+            label (str): Label of the table.
+            number_format (Optional[NumberFormat]): Formatting of
+                numeric columns.
+        """
+        written = False
+        try:
+            with open_chunks() as chunks, open(path, "wt") as file:
+                table = LatexLongTable(chunks, label, number_format)
+                for fragment in table.fragments():
+                    file.write(fragment)
+                    job.report(table.rows_num, 0)
+            job.check()
+            written = True
+        finally:
+            if not written and os.path.exists(path):
+                os.remove(path)
+
+    def longtable_written(self, name: str, section: str) -> None:
+        """Include longtable written in background in the section.
+
+        Args:
+            name (str): Name of `.tex` file without extension.
+            section (str): Section active when table was added.
+        """
+        self.status.configure(text="")
+        self.insert_snippet(section, f"\n\\input{{{name}}}")
 
     def add_math(self) -> None:
         """Add math to project."""
+        from toplevel import EnterMath
         EnterMath(Mode.DISPLAYMATH, self.insert_text, self)
 
     def add_equation(self) -> None:
         """Add equation to project"""
+        from toplevel import EnterMath
         EnterMath(Mode.EQUATION, self.insert_text, self)
 
     def insert_text(self, math_object: str, flag: str) -> None:
         """Insert math or equation to project."""
-        self.save()
         if flag == Mode.DISPLAYMATH:
-            self.tex_file.text[self.active_section] +=\
-                 LatexMath.write_displaymath(math_object)
+            snippet = LatexMath.write_displaymath(math_object)
         elif flag == Mode.EQUATION:
-            self.tex_file.text[self.active_section] +=\
-                LatexMath.write_equation(math_object)
-        try:
-            self.entry.textbox.delete(1.0, END)
-        except AttributeError:
-            self.entry.delete(1.0, END)
-        self.entry.insert(
-            INSERT, self.tex_file.text[self.active_section]
-        )
-        self.save()
+            snippet = LatexMath.write_equation(
+                math_object, self.new_label("equation")
+            )
+        else:
+            return
+        self.insert_snippet(self.active_section, snippet)
 
     def save_as(self) -> None:
         """Method responsible for 'save as...' button."""
@@ -440,12 +969,13 @@ class ProjectWindow(CTk):
                 message="New project name must not be empty."
             )
             return
-        if new_name in SETTINGS["projects"].keys():
+        if new_name in settings.SETTINGS["projects"].keys():
             msg.showerror(
                 title="Fatal Error",
                 message="New project name already exists."
             )
             return
+        self.save_now()
         os.rename(
             self.project_path + f"/{self.tex_file.title}",
             self.project_path + new_name + ".json"
@@ -455,13 +985,15 @@ class ProjectWindow(CTk):
             self.project_path[:self.project_path.find("/")+1] + new_name
             + "/"
         )
-        SETTINGS["projects"][new_name] = []
-        SETTINGS["projects"][new_name].extend([
+        settings.SETTINGS["projects"][new_name] = []
+        settings.SETTINGS["projects"][new_name].extend([
             self.project_path[:self.project_path.find("/") + 1] + new_name
             + "/",
             new_name + ".json"
         ])
-        del SETTINGS["projects"][self.tex_file.title[:-5]]
+        del settings.SETTINGS["projects"][self.tex_file.title[:-5]]
+        project_index().rename(self.tex_file.title[:-5], new_name)
+        text_index().rename(self.tex_file.title[:-5], new_name)
         self.tex_file.title = new_name + ".json"
         self.tex_file.folder_path = (
                 self.project_path[:self.project_path.find("/") + 1] + new_name
@@ -476,10 +1008,10 @@ class ProjectWindow(CTk):
             self.project_path[:self.project_path.find("/") + 1] + new_name
             + "/"
         )
-        SETTINGS["current"] = [self.project_path, new_name + ".json"]
-        update_settings(SETTINGS)
+        settings.SETTINGS["current"] = [self.project_path, new_name + ".json"]
+        update_settings(settings.SETTINGS)
         top.destroy()
-        self.tex_file.save()
+        self.autosave.flush()
 
     def export(self) -> None:
         """Export project to directory, prepare it for compilation."""
@@ -490,28 +1022,101 @@ class ProjectWindow(CTk):
         except AttributeError:
             print("Cancelled")
             return
-        self.tex_file.export(path)
-        self.pack_figs(path)
+        self.export_path = path
+        self.save()
+        self.jobs.submit(
+            "Exporting",
+            self.export_job,
+            path,
+            on_done=self.exported,
+            on_error=self.show_error,
+            on_progress=self.show_progress
+        )
+
+    def compile(self) -> None:
+        """Export project again to last export folder and compile it in
+        background. Repeated requests are merged, stale build is
+        cancelled.
+        """
+        if self.export_path is None:
+            self.export()
+            if self.export_path is None:
+                return
+        else:
+            self.save()
+            self.jobs.submit(
+                "Exporting",
+                self.export_job,
+                self.export_path,
+                on_done=self.exported,
+                on_error=self.show_error,
+                on_progress=self.show_progress
+            )
+        self.compile_wanted = True
+
+    def request_compile(self) -> None:
+        """Request compilation of last export."""
+        self.compile_wanted = False
+        self.status.configure(text="Compiling")
+        self.compiler.request(self.export_path, self.compiled.put)
+        if not self.compile_polling:
+            self.compile_polling = True
+            self.compile_after = self.after(POLL_MS, self.poll_compile)
+
+    def poll_compile(self) -> None:
+        """Show result of compilation finished in background."""
+        try:
+            result = self.compiled.get_nowait()
+        except Empty:
+            self.compile_after = self.after(POLL_MS, self.poll_compile)
+            return
+        self.compile_polling = False
+        self.compile_after = None
+        if result.pdf is None:
+            self.status.configure(text="Compilation failed")
+            msg.showerror(
+                title="Compilation failed",
+                message=result.log[-500:] or f"Exit code {result.returncode}"
+            )
+            return
+        self.status.configure(
+            text="Compiled (cached)" if result.cached else "Compiled"
+        )
 
-    def pack_figs(self, path: str) -> None:
-        """Pack all picture files to **compilation** folder.
+    def export_job(self, job: Job, path: str) -> List[PackResult]:
+        """Export project with its pictures, run as background job.
 
         Args:
+            job (Job): Job running the export.
             path (str): path to **compilation** folder.
+
+        Returns:
+            List[PackResult]: Timings of packed files.
+        """
+        return self.tex_file.export(
+            path, job, settings.SETTINGS.get("packing", STRATEGIES[0])
+        )
+
+    def exported(self, results: List[PackResult]) -> None:
+        """Report finished export.
+
+        Args:
+            results (List[PackResult]): Timings of packed files.
         """
-        main_path = Path(self.project_path)
-        files = main_path.glob("*")
-        for file in files:
-            if file.suffix == ".json":
-                continue
-            copyfile(file, path + "/" + file.name)
+        self.packed = results
+        self.status.configure(text=f"Exported, {report(results)}")
+        if self.compile_wanted:
+            self.request_compile()
+
+    def export_report(self) -> None:
+        """Show method and time of every file packed by last export."""
+        msg.showinfo(
+            title="Export report",
+            message="\n".join([report(self.packed), *details(self.packed)])
+        )
 
     def close_project(self) -> None:
         """Close project and open main menu."""
-        SETTINGS["current"] = None
-        update_settings(SETTINGS)
+        settings.SETTINGS["current"] = None
+        update_settings(settings.SETTINGS)
         self.reboot()
-
-    def run(self) -> None:
-        """Run the project window."""
-        self.mainloop()
@@ -0,0 +1,372 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module contains search indexes of the app:
+
+* ProjectIndex is used for finding projects by name, by prefix or
+fuzzy match, while user is typing.
+* TextIndex is inverted index of text of sections of all projects,
+stored on disk, so projects are not loaded while searching.
+"""
+import os
+import re
+import sqlite3
+from bisect import bisect_left, insort
+from collections import defaultdict
+from threading import Lock
+from typing import (Dict, Iterable, List, Mapping, NamedTuple, Optional,
+                    Set)
+
+from jobs import Job
+from settings import load_settings, search_path
+from storage import load_sections
+
+TERM = re.compile(r"\w+")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    section TEXT NOT NULL,
+    UNIQUE (project, section)
+);
+CREATE TABLE IF NOT EXISTS lines (
+    section INTEGER NOT NULL,
+    num INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (section, num)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    section INTEGER NOT NULL,
+    num INTEGER NOT NULL,
+    PRIMARY KEY (term, section, num)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_section ON postings (section);
+"""
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of lowercase text, padded so short words have some."""
+    text = f"  {text.lower()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProjectIndex:
+    """In-memory index of project names, updated incrementally."""
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        """Constructor of ProjectIndex class.
+
+        Args:
+            names (Iterable[str]): Initial names of projects.
+        """
+        self.sorted: List[str] = []
+        self.names: Dict[str, str] = {}
+        self.grams: Dict[str, Set[str]] = defaultdict(set)
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        """Add project to the index.
+
+        Args:
+            name (str): Name of the project.
+        """
+        if name in self.names:
+            return
+        key = name.lower() + "\0" + name
+        self.names[name] = key
+        insort(self.sorted, key)
+        for gram in trigrams(name):
+            self.grams[gram].add(name)
+
+    def remove(self, name: str) -> None:
+        """Remove project from the index.
+
+        Args:
+            name (str): Name of the project.
+        """
+        key = self.names.pop(name, None)
+        if key is None:
+            return
+        del self.sorted[bisect_left(self.sorted, key)]
+        for gram in trigrams(name):
+            self.grams[gram].discard(name)
+            if not self.grams[gram]:
+                del self.grams[gram]
+
+    def rename(self, old: str, new: str) -> None:
+        """Rename project in the index.
+
+        Args:
+            old (str): Old name of the project.
+            new (str): New name of the project.
+        """
+        self.remove(old)
+        self.add(new)
+
+    def prefix(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Projects, whose names start with query, case insensitive.
+
+        Args:
+            query (str): Beginning of name.
+            limit (Optional[int]): Maximal number of results.
+
+        Returns:
+            List[str]: Names in alphabetical order.
+        """
+        query = query.lower()
+        found = []
+        for key in self.sorted[bisect_left(self.sorted, query):]:
+            if not key.startswith(query) or len(found) == limit:
+                break
+            found.append(key[key.index("\0") + 1:])
+        return found
+
+    def fuzzy(self, query: str, limit: int = 50) -> List[str]:
+        """Projects with names similar to query, by shared trigrams.
+
+        Args:
+            query (str): Part of name, possibly misspelled.
+            limit (int): Maximal number of results.
+
+        Returns:
+            List[str]: Names, best matches first.
+        """
+        query_grams = trigrams(query)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for name in self.grams.get(gram, ()):
+                shared[name] += 1
+        scores = {
+            name: count / len(query_grams | trigrams(name))
+            for name, count in shared.items()
+        }
+        ranked = sorted(
+            (name for name, score in scores.items() if score >= 0.15),
+            key=lambda name: (-scores[name], name.lower())
+        )
+        return ranked[:limit]
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Prefix matches first, then fuzzy ones.
+
+        Args:
+            query (str): Text typed by user.
+            limit (int): Maximal number of results.
+
+        Returns:
+            List[str]: Names of projects.
+        """
+        found = self.prefix(query, limit)
+        seen = set(found)
+        for name in self.fuzzy(query, limit):
+            if len(found) == limit:
+                break
+            if name not in seen:
+                found.append(name)
+        return found
+
+
+_project_index: Optional[ProjectIndex] = None
+
+
+def project_index() -> ProjectIndex:
+    """Index of all projects, built on first call."""
+    global _project_index
+    if _project_index is None:
+        _project_index = ProjectIndex(load_settings()["projects"])
+    return _project_index
+
+
+class Hit(NamedTuple):
+    """Line of section matching the query."""
+    project: str
+    section: str
+    line: int
+    text: str
+
+
+class TextIndex:
+    """Inverted index of words of all sections, in sqlite database.
+    Sections are indexed again only when saved after change.
+    """
+
+    def __init__(self, path: str = search_path) -> None:
+        """Constructor of TextIndex class.
+
+        Args:
+            path (str): Path to database file.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # used by autosave thread too, access is guarded by lock
+        self.connection = sqlite3.connect(
+            path, timeout=10, check_same_thread=False
+        )
+        self.lock = Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def update(
+            self,
+            project: str,
+            changed: Mapping[str, str],
+            order: Optional[List[str]] = None
+    ) -> None:
+        """Index changed sections of the project.
+
+        Args:
+            project (str): Name of the project.
+            changed (Mapping[str, str]): Changed sections with their
+                text.
+            order (Optional[List[str]]): All sections of the project,
+                if they were added or removed.
+        """
+        with self.lock, self.connection as db:
+            if order is not None:
+                kept = set(order)
+                for section_id, section in db.execute(
+                        "SELECT id, section FROM sections WHERE project = ?",
+                        (project,)).fetchall():
+                    if section not in kept:
+                        self.drop(section_id)
+            for section, text in changed.items():
+                db.execute(
+                    "INSERT OR IGNORE INTO sections (project, section)"
+                    " VALUES (?, ?)",
+                    (project, section)
+                )
+                section_id = db.execute(
+                    "SELECT id FROM sections WHERE project = ?"
+                    " AND section = ?",
+                    (project, section)
+                ).fetchone()[0]
+                self.drop(section_id, keep=True)
+                lines = [
+                    (section_id, num, line)
+                    for num, line in enumerate(text.split("\n"), 1)
+                    if line.strip()
+                ]
+                db.executemany("INSERT INTO lines VALUES (?, ?, ?)", lines)
+                db.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    (
+                        (term, section_id, num)
+                        for _, num, line in lines
+                        for term in set(TERM.findall(line.lower()))
+                    )
+                )
+
+    def drop(self, section_id: int, keep: bool = False) -> None:
+        """Remove section from index, lock has to be held.
+
+        Args:
+            section_id (int): Id of section.
+            keep (bool): Remove only text of section.
+        """
+        db = self.connection
+        db.execute("DELETE FROM postings WHERE section = ?", (section_id,))
+        db.execute("DELETE FROM lines WHERE section = ?", (section_id,))
+        if not keep:
+            db.execute("DELETE FROM sections WHERE id = ?", (section_id,))
+
+    def remove(self, project: str) -> None:
+        """Remove project from index.
+
+        Args:
+            project (str): Name of the project.
+        """
+        with self.lock, self.connection as db:
+            for section_id, in db.execute(
+                    "SELECT id FROM sections WHERE project = ?",
+                    (project,)).fetchall():
+                self.drop(section_id)
+
+    def rename(self, old: str, new: str) -> None:
+        """Rename project in index.
+
+        Args:
+            old (str): Old name of the project.
+            new (str): New name of the project.
+        """
+        with self.lock, self.connection as db:
+            db.execute(
+                "UPDATE sections SET project = ? WHERE project = ?",
+                (new, old)
+            )
+
+    def add_missing(
+            self,
+            projects: Mapping[str, List[str]],
+            job: Optional[Job] = None
+    ) -> int:
+        """Index projects, which were not saved since index was created.
+
+        Args:
+            projects (Mapping[str, List[str]]): Folder and `.json` file
+                of each project, by name.
+            job (Optional[Job]): Background job running the indexing.
+
+        Returns:
+            int: Number of indexed projects.
+        """
+        indexed = self.projects()
+        missing = [name for name in projects if name not in indexed]
+        for done, name in enumerate(missing):
+            if job is not None:
+                job.report(done, len(missing))
+            folder, title = projects[name]
+            text, _ = load_sections(os.path.join(folder, title))
+            self.update(name, text, list(text))
+        return len(missing)
+
+    def projects(self) -> Set[str]:
+        """Names of indexed projects."""
+        with self.lock:
+            return {
+                project for project, in self.connection.execute(
+                    "SELECT DISTINCT project FROM sections"
+                )
+            }
+
+    def search(self, query: str, limit: int = 100) -> List[Hit]:
+        """Lines containing all words of query, last word may be
+        incomplete.
+
+        Args:
+            query (str): Words to be found, case insensitive.
+            limit (int): Maximal number of results.
+
+        Returns:
+            List[Hit]: Matching lines, ordered by project, section and
+                line.
+        """
+        terms = TERM.findall(query.lower())
+        if not terms:
+            return []
+        parts = [
+            "SELECT section, num FROM postings WHERE term = ?"
+        ] * (len(terms) - 1)
+        parts.append(
+            "SELECT section, num FROM postings WHERE term >= ? AND term < ?"
+        )
+        params = [*terms, terms[-1] + "\U0010ffff", limit]
+        sql = (
+            "SELECT s.project, s.section, l.num, l.text FROM ("
+            + " INTERSECT ".join(parts)
+            + ") AS m JOIN sections AS s ON s.id = m.section"
+            " JOIN lines AS l ON l.section = m.section AND l.num = m.num"
+            " ORDER BY s.project, s.section, l.num LIMIT ?"
+        )
+        with self.lock:
+            return [Hit(*row) for row in self.connection.execute(sql, params)]
+
+
+_text_index: Optional[TextIndex] = None
+
+
+def text_index() -> TextIndex:
+    """Full-text index of all projects, opened on first call."""
+    global _text_index
+    if _text_index is None:
+        _text_index = TextIndex()
+    return _text_index
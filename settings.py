@@ -3,39 +3,96 @@
 Settings file, contains:
 
 - All the constants,
-- Settings imported form ``.json`` file,
+- Settings imported form ``.json`` file, loaded on first access,
 """
-from enum import Enum, auto
 import json
 import os
+import stat
+from enum import Enum, auto
 from json import load
+from tempfile import mkstemp
 
 RUN = True
 settings_path = os.path.join("ProjectData")
 user_path = os.path.join("UserData")
+blob_path = os.path.join("UserData", ".blobs")
+pdf_cache_path = os.path.join("UserData", ".pdfcache")
+search_path = os.path.join("UserData", ".search.db")
 settings_path_json = os.path.join("ProjectData", "SETTINGS.json")
+equations_path = os.path.join("ProjectData", "equations.db")
+equations_backup_path = os.path.join("ProjectData", "equations.backup.json")
+
+
+_settings = None
+# Window sizes read from ``.json`` file, on first access.
+_SIZES = {
+    "WIDTH": "width",
+    "HEIGHT": "height",
+    "M_WIDTH": "main_width",
+    "M_HEIGHT": "main_height",
+    "TOP_WIDTH": "top_width",
+    "TOP_HEIGHT": "top_height",
+}
+
+
+def load_settings() -> dict:
+    """Settings from ``.json`` file, read on first call."""
+    global _settings
+    if _settings is None:
+        with open(settings_path_json, "rt") as file:
+            _settings = load(file)
+    return _settings
+
 
+def __getattr__(name: str):
+    """Load ``SETTINGS`` and window sizes on first access."""
+    if name == "SETTINGS":
+        return load_settings()
+    if name in _SIZES:
+        return load_settings()["window"][_SIZES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-with open(settings_path_json, "rt") as file:
-    SETTINGS = load(file)
 
-WIDTH, HEIGHT = (SETTINGS["window"]["width"], SETTINGS["window"]["height"])
-M_WIDTH, M_HEIGHT = (
-    SETTINGS["window"]["main_width"],
-    SETTINGS["window"]["main_height"]
-)
-TOP_WIDTH, TOP_HEIGHT = (
-    SETTINGS["window"]["top_width"],
-    SETTINGS["window"]["top_height"]
-)
 PADDING = 25
+CHUNK_SIZE = 10_000  # rows read at once when streaming tables
+SHEET_CACHE_SIZE = 4  # parsed `.xlsx` sheets kept in memory
+PICTURE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".pdf")
+SIGNIFICANT_FIGURES = ["All", "2", "3", "4", "5", "6"]
 help_file = os.path.join("ProjectData", "help.pdf")
+# umask can only be read by setting it, so it is done once at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Write text file, so it is either fully written or left intact,
+    even if app crashes in the middle. Permissions of replaced file are
+    kept, new file gets the default ones.
+
+    Args:
+        path (str): Path to file.
+        text (str): Content of file.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    handle, temp = mkstemp(dir=os.path.dirname(path) or ".")
+    try:
+        os.chmod(temp, mode)
+        with os.fdopen(handle, "wt", encoding="utf-8") as file_:
+            file_.write(text)
+            file_.flush()
+            os.fsync(file_.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
 
 
 def update_settings(settings):
     """Update the settings."""
-    with open(settings_path_json, "wt") as file_:
-        json.dump(settings, file_, indent=4)
+    write_atomic(settings_path_json, json.dumps(settings, indent=4))
 
 
 def get_percent(num: int, percent: float) -> int:
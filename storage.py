@@ -0,0 +1,152 @@
+"""Author: Szymon Lasota, Aleksandra Supeł
+Module is responsible for storing projects on disk. Every section is
+kept in its own file in `sections` folder of the project, project
+`.json` file holds only the index of sections. Only sections changed
+since last save are written, each file is replaced atomically.
+
+Projects saved in old layout (single `.json` file with text of all
+sections) are read as well and rewritten in the new layout on the next
+save.
+"""
+import hashlib
+import json
+import os
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from settings import write_atomic
+
+SECTIONS_DIR = "sections"
+FORMAT = 2
+
+
+class SectionDict(dict):
+    """Dictionary of sections, that tracks which of them changed."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Constructor of SectionDict class, accepts same arguments as
+        `dict`. Initial content is considered saved.
+        """
+        super().__init__(*args, **kwargs)
+        self.lock = RLock()
+        self.dirty = set()
+        self.layout_changed = False
+
+    def __setitem__(self, key: str, value: str) -> None:
+        with self.lock:
+            if key not in self:
+                self.layout_changed = True
+            elif dict.__getitem__(self, key) == value:
+                return
+            super().__setitem__(key, value)
+            self.dirty.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        with self.lock:
+            super().__delitem__(key)
+            self.dirty.discard(key)
+            self.layout_changed = True
+
+    def mark_dirty(self, keys: Iterable[str], layout: bool = False) -> None:
+        """Mark sections as changed.
+
+        Args:
+            keys (Iterable[str]): Changed sections.
+            layout (bool): Whether order or set of sections changed.
+        """
+        with self.lock:
+            self.dirty.update(key for key in keys if key in self)
+            self.layout_changed = self.layout_changed or layout
+
+    def take_dirty(self) -> Tuple[Dict[str, str], Optional[List[str]]]:
+        """Take snapshot of changes and mark everything as saved.
+
+        Returns:
+            Tuple[Dict[str, str], Optional[List[str]]]: Changed sections
+                with their text and order of sections if it changed.
+        """
+        with self.lock:
+            changed = {key: self[key] for key in self.dirty}
+            order = list(self) if self.layout_changed else None
+            self.dirty = set()
+            self.layout_changed = False
+        return changed, order
+
+
+def section_file(section: str) -> str:
+    """Name of file storing the section."""
+    return hashlib.sha1(section.encode("utf-8")).hexdigest()[:16] + ".tex"
+
+
+def load_sections(path: str) -> Tuple[Dict[str, str], bool]:
+    """Load text of all sections of the project.
+
+    Args:
+        path (str): Path to project `.json` file.
+
+    Returns:
+        Tuple[Dict[str, str], bool]: Sections with their text and
+            whether project is stored in old layout.
+    """
+    try:
+        with open(path, "rt") as file:
+            index = json.load(file)
+    except FileNotFoundError:
+        return {}, False
+    if not isinstance(index.get("sections"), list):
+        return index, True
+    folder = os.path.join(os.path.dirname(path), SECTIONS_DIR)
+    sections = {}
+    for section in index["sections"]:
+        with open(
+                os.path.join(folder, section["file"]),
+                "rt",
+                encoding="utf-8"
+        ) as file:
+            sections[section["name"]] = file.read()
+    return sections, False
+
+
+def save_sections(
+        path: str,
+        text: SectionDict,
+        full: bool = False
+) -> Tuple[Dict[str, str], Optional[List[str]]]:
+    """Write sections changed since last save.
+
+    Args:
+        path (str): Path to project `.json` file.
+        text (SectionDict): Sections of the project.
+        full (bool): Write all sections and index, used to migrate
+            project from old layout.
+
+    Returns:
+        Tuple[Dict[str, str], Optional[List[str]]]: Written sections
+            and order of sections if it changed.
+    """
+    if full:
+        text.mark_dirty(text, layout=True)
+    changed, order = text.take_dirty()
+    folder = os.path.join(os.path.dirname(path), SECTIONS_DIR)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        for section, value in changed.items():
+            write_atomic(os.path.join(folder, section_file(section)), value)
+        if order is None:
+            return changed, order
+        index = [
+            {"name": section, "file": section_file(section)}
+            for section in order
+        ]
+        write_atomic(
+            path,
+            json.dumps({"format": FORMAT, "sections": index}, indent=4)
+        )
+        used = {section["file"] for section in index}
+        for name in os.listdir(folder):
+            if name not in used:
+                os.remove(os.path.join(folder, name))
+    except BaseException:
+        text.mark_dirty(changed, layout=order is not None)
+        raise
+    return changed, order
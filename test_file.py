@@ -2,14 +2,67 @@
 Module contains test functions for the project.
 Tests are written for `LatexTable` class.
 """
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from queue import Queue
+from threading import Event
+from tkinter import INSERT, TclError, Text, Tk
+from types import SimpleNamespace
+from typing import Iterable, Iterator, List
+
 import pytest
-from pandas import DataFrame
+from pandas import DataFrame, ExcelWriter, read_csv
 
-from texfigures import LatexTable
+import equations
+import packing
+import search
+import settings
+from autosave import AutoSaver
+from blobstore import BlobStore
+from compiler import CompileResult, CompileService
+from datafiles import (LazyWorkbook, TableBatch, TableResult, find_files,
+                       render_file, to_numbers)
+from editor import EditorCache, WindowedBuffer, text_widget
+from equations import EquationStore
+from highlight import Highlighter, TextHighlighter, lex_line
+from jobs import Job, JobCancelled, JobScheduler
+from labels import LabelIndex
+from latex import TexFile
+from manifest import MANIFEST_NAME
+from numformat import NumberFormat
+from packing import STRATEGIES, details, pack_file, pack_files, report
+from search import ProjectIndex, TextIndex
+from settings import Mode, Sections, write_atomic
+from storage import SECTIONS_DIR
+from texfigures import LatexLongTable, LatexMath, LatexTable
 
 
 # Run test from cmd
 # python -m pytest test_file.py
+@pytest.fixture(autouse=True)
+def memory_text_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(search, "_text_index", TextIndex(":memory:"))
+
+
+@pytest.fixture
+def tk_root() -> Iterator[Tk]:
+    try:
+        root = Tk()
+    except TclError:
+        pytest.skip("Tk needs a display")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
 @pytest.fixture
 def empty_dataframe() -> DataFrame:
     return DataFrame()
@@ -87,3 +140,963 @@ def test_repr(dataframe: DataFrame) -> None:
         + "\\caption*{Gdzie}\n"
         + "\\end{table}"
     )
+
+
+@pytest.fixture
+def mixed_dataframe() -> DataFrame:
+    return DataFrame(
+        {
+            "int": [1, -2, 3],
+            "float": [0.1 + 0.2, float("nan"), 1e20],
+            "bool": [True, False, True],
+            "text": ["a", None, "Supeł"],
+        }
+    )
+
+
+def test_render_matches_write(
+        empty_dataframe: DataFrame,
+        dataframe: DataFrame,
+        mixed_dataframe: DataFrame
+) -> None:
+    for df in (empty_dataframe, dataframe, mixed_dataframe):
+        table = LatexTable(df)
+        assert table.render_tab() == table.write_tab()
+
+
+def test_longtable_chunks(mixed_dataframe: DataFrame) -> None:
+    chunks = (mixed_dataframe.iloc[i:i + 2] for i in range(0, 3, 2))
+    file = StringIO()
+    assert LatexLongTable(chunks).write(file) == 3
+    body = LatexTable(mixed_dataframe).render_tab()
+    body = body[body.index("\n") + 1:]
+    assert file.getvalue() == (
+        LatexLongTable.head(mixed_dataframe.columns) + body
+        + LatexLongTable.foot()
+    )
+
+
+def test_write_longtable_cleans_up(tmp_path: Path) -> None:
+    from pviev import ProjectWindow
+    data = tmp_path / "data.csv"
+    data.write_text("a;b\n" + "1;2\n" * 50)
+    out = tmp_path / "table1.tex"
+    closed = []
+
+    @contextmanager
+    def open_chunks(path: Path = data) -> Iterator[Iterable[DataFrame]]:
+        reader = read_csv(path, sep=";", chunksize=10)
+        try:
+            yield reader
+        finally:
+            reader.close()
+            closed.append(path.name)
+
+    ProjectWindow.write_longtable(
+        Job("Write", Queue()), open_chunks, str(out), "tab:1"
+    )
+    assert out.read_text().count("1&2\\\\ \\hline\n") == 50
+    job = Job("Write", Queue())
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        ProjectWindow.write_longtable(job, open_chunks, str(out), "tab:1")
+    assert not out.exists()
+    (tmp_path / "bad.csv").write_text("a;b\n1;2\n1;2;3;4\n")
+    with pytest.raises(Exception):
+        ProjectWindow.write_longtable(
+            Job("Write", Queue()),
+            lambda: open_chunks(tmp_path / "bad.csv"),
+            str(out),
+            "tab:1"
+        )
+    assert not out.exists()
+    assert closed == ["data.csv", "data.csv", "bad.csv"]
+
+
+def test_lazy_workbook(tmp_path: Path, dataframe: DataFrame) -> None:
+    path = str(tmp_path / "data.xlsx")
+    with ExcelWriter(path) as writer:
+        for sheet in ("first", "second", "third"):
+            dataframe.to_excel(writer, sheet_name=sheet, index=False)
+    workbook = LazyWorkbook(path, cache_size=2)
+    assert list(workbook.keys()) == ["first", "second", "third"]
+    assert not workbook.cache
+    assert workbook["second"].equals(dataframe)
+    workbook["first"]
+    workbook["third"]
+    assert list(workbook.cache) == ["first", "third"]
+    with ThreadPoolExecutor(8) as pool:
+        frames = list(pool.map(
+            workbook.__getitem__, ["first", "second", "third"] * 10
+        ))
+    assert all(df.equals(dataframe) for df in frames)
+    assert len(workbook.cache) == 2
+
+
+class FakeRoot:
+    """Stand-in for Tk root, `after` callbacks are run by the test."""
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def after(self, _: int, func) -> int:
+        self.calls.append(func)
+        return len(self.calls)
+
+    def after_cancel(self, _: int) -> None:
+        pass
+
+    def run(self, scheduler: JobScheduler) -> None:
+        while self.calls:
+            scheduler.threads.shutdown(wait=True)
+            self.calls.pop()()
+
+
+def test_scheduler_callbacks() -> None:
+    root = FakeRoot()
+    scheduler = JobScheduler(root)
+    results, progress, errors = [], [], []
+
+    def work(job: Job, total: int) -> int:
+        for num in range(total):
+            job.report(num + 1, total)
+        return total
+
+    scheduler.submit(
+        "work", work, 3,
+        on_done=results.append,
+        on_progress=lambda job, done, total: progress.append(done)
+    )
+    scheduler.submit("fail", lambda job: 1 / 0, on_error=errors.append)
+    root.run(scheduler)
+    assert results == [3] and progress == [1, 2, 3]
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert not scheduler.running()
+
+
+def test_scheduler_cancel() -> None:
+    root = FakeRoot()
+    scheduler = JobScheduler(root, workers=1)
+    results, cancelled = [], []
+    blocker = scheduler.submit("block", lambda job: job.check())
+    job = scheduler.submit(
+        "late", lambda job: 1, on_done=results.append,
+        on_cancel=lambda: cancelled.append("late")
+    )
+    job.cancel()
+    blocker.cancel()
+    root.run(scheduler)
+    assert results == [] and not scheduler.running()
+    assert cancelled == ["late"]
+
+
+def test_incremental_export(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.png").write_bytes(b"a")
+    (project / "b.png").write_bytes(b"b")
+    tex_file = TexFile(str(project) + "/", "project.json")
+    tex_file.save()
+    out = tmp_path / "out"
+    tex_file.export(str(out))
+    assert sorted(file.name for file in out.iterdir()) == [
+        MANIFEST_NAME, "a.png", "b.png", "main.tex"
+    ]
+    (out / "a.png").write_bytes(b"kept")
+    (project / "b.png").unlink()
+    tex_file.export(str(out))
+    assert (out / "a.png").read_bytes() == b"kept"
+    assert not (out / "b.png").exists()
+
+
+def test_failed_pack_is_repeated(
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path
+) -> None:
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "fig.png").write_bytes(b"full picture" * 100)
+    tex_file = TexFile(str(project) + "/", "project.json")
+    out = tmp_path / "out"
+
+    def truncate(source: str, target: str, strategy: str) -> str:
+        Path(target).write_bytes(Path(source).read_bytes()[:10])
+        raise OSError("No space left on device")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(packing, "pack_file", truncate)
+        with pytest.raises(OSError):
+            tex_file.export(str(out))
+    assert (out / "fig.png").stat().st_size == 10
+    tex_file.export(str(out))
+    assert (out / "fig.png").read_bytes() == b"full picture" * 100
+
+
+def test_pack_strategies(tmp_path: Path) -> None:
+    source = tmp_path / "source.png"
+    source.write_bytes(b"picture")
+    for strategy in STRATEGIES:
+        target = tmp_path / f"{strategy}.png"
+        target.write_bytes(b"old")
+        method = pack_file(str(source), str(target), strategy)
+        assert method in STRATEGIES[STRATEGIES.index(strategy):]
+        assert target.read_bytes() == b"picture"
+
+
+def test_pack_files_order(tmp_path: Path) -> None:
+    files = []
+    for num in range(20):
+        (tmp_path / f"{num}.png").write_bytes(bytes([num]))
+        files.append((str(tmp_path / f"{num}.png"), str(tmp_path / f"{num}")))
+    results = pack_files(
+        files, "copy", skip=lambda source, target: target == files[7][1]
+    )
+    assert [result.name for result in results] == [
+        str(num) for num in range(20) if num != 7
+    ]
+    assert not (tmp_path / "7").exists()
+    assert report(results[:0]) == "packed 0 files in 0.00 ms"
+    assert report(results).startswith("packed 19 files in ")
+    assert report(results).endswith(" ms (copy 19)")
+    assert details(results)[0].startswith("0: copy, ")
+
+
+def test_blob_deduplication(tmp_path: Path) -> None:
+    picture = tmp_path / "setup.png"
+    picture.write_bytes(b"lab setup")
+    store = BlobStore(str(tmp_path / "blobs"))
+    copied = []
+    for name in ("first", "second"):
+        (tmp_path / name).mkdir()
+        tex_file = TexFile(str(tmp_path / name) + "/", f"{name}.json")
+        tex_file.store = store
+        copied.append(tex_file.store_pic(str(picture), "setup.png"))
+        tex_file.save()
+    assert copied == [True, False]
+    assert len([file for file in (tmp_path / "blobs").rglob("*")
+                if file.is_file()]) == 1
+    tex_file.export(str(tmp_path / "out"))
+    assert (tmp_path / "out" / "setup.png").read_bytes() == b"lab setup"
+    assert not (tmp_path / "second" / "setup.png").exists()
+
+
+def test_export_does_not_link_blobs(tmp_path: Path) -> None:
+    picture = tmp_path / "setup.png"
+    picture.write_bytes(b"lab setup")
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.store = BlobStore(str(tmp_path / "blobs"))
+    tex_file.store_pic(str(picture), "setup.png")
+    blob = Path(tex_file.store.path(tex_file.assets["setup.png"]))
+    out = tmp_path / "out"
+    tex_file.export(str(out))
+    assert blob.stat().st_nlink == 1
+    (out / "setup.png").write_bytes(b"edited")
+    assert blob.read_bytes() == b"lab setup"
+
+    (out / "setup.png").unlink()
+    (out / "setup.png").hardlink_to(blob)
+    tex_file.export(str(out))
+    assert blob.stat().st_nlink == 1
+    assert (out / "setup.png").read_bytes() == b"lab setup"
+
+
+def test_export_pictures_sharing_blob(tmp_path: Path) -> None:
+    picture = tmp_path / "setup.png"
+    picture.write_bytes(b"lab setup")
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.store = BlobStore(str(tmp_path / "blobs"))
+    tex_file.store_pics([(str(picture), "a.png"), (str(picture), "b.png")])
+    picture.unlink()
+    out = tmp_path / "out"
+    for _ in range(2):
+        tex_file.export(str(out))
+        assert sorted(file.name for file in out.iterdir()) == [
+            MANIFEST_NAME, "a.png", "b.png", "main.tex"
+        ]
+    assert (out / "a.png").read_bytes() == b"lab setup"
+
+
+def test_legacy_project_migration(tmp_path: Path) -> None:
+    legacy = {"Preamble": "pre", "Introduction": "intro", "Other": "x"}
+    (tmp_path / "old.json").write_text(json.dumps(legacy))
+    tex_file = TexFile(str(tmp_path) + "/", "old.json")
+    assert tex_file.legacy
+    tex_file.save()
+    index = json.loads((tmp_path / "old.json").read_text())
+    assert [section["name"] for section in index["sections"]] == [
+        "Preamble", "Introduction", "Other", "End"
+    ]
+    assert len(list((tmp_path / SECTIONS_DIR).iterdir())) == 4
+
+    tex_file = TexFile(str(tmp_path) + "/", "old.json")
+    assert not tex_file.legacy and not tex_file.text.dirty
+    tex_file.text["Other"] = "x"
+    tex_file.text["Introduction"] += " changed"
+    assert tex_file.text.dirty == {"Introduction"}
+    del tex_file.text["Other"]
+    tex_file.save()
+    reloaded = TexFile(str(tmp_path) + "/", "old.json").text
+    assert dict(reloaded) == {
+        "Preamble": "pre",
+        "Introduction": "intro changed",
+        "End": "\\end{document}"
+    }
+    assert len(list((tmp_path / SECTIONS_DIR).iterdir())) == 3
+
+
+def test_write_atomic_keeps_mode(tmp_path: Path) -> None:
+    path = tmp_path / "SETTINGS.json"
+    write_atomic(str(path), "{}")
+    assert path.stat().st_mode & 0o777 == 0o666 & ~settings._UMASK
+    path.chmod(0o640)
+    write_atomic(str(path), '{"a": 1}')
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert path.read_text() == '{"a": 1}'
+    assert [file.name for file in tmp_path.iterdir()] == ["SETTINGS.json"]
+
+
+def test_autosave_coalesces() -> None:
+    saves = []
+    saver = AutoSaver(lambda: saves.append(time.monotonic()), delay=0.05)
+    for _ in range(10):
+        saver.mark_dirty()
+    time.sleep(0.3)
+    assert len(saves) == 1
+    saver.mark_dirty()
+    saver.close()
+    assert len(saves) == 2
+    saver.flush()
+    assert len(saves) == 2
+
+
+STUB_COMPILER = """
+import os, time
+with open("../builds.txt", "at") as file:
+    file.write("start\\n")
+while not os.path.exists("../release"):
+    time.sleep(0.01)
+with open("main.tex") as source, open("main.pdf", "wt") as pdf:
+    pdf.write(source.read())
+"""
+
+
+def stub_service(tmp_path: Path, release: bool = True) -> CompileService:
+    (tmp_path / "stub.py").write_text(STUB_COMPILER)
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "main.tex").write_text("first")
+    if release:
+        (tmp_path / "release").touch()
+    return CompileService(
+        [sys.executable, str(tmp_path / "stub.py")],
+        delay=0.05,
+        cache=str(tmp_path / "cache")
+    )
+
+
+def wait_until(condition, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_compile_cache(tmp_path: Path) -> None:
+    service = stub_service(tmp_path)
+    folder = str(tmp_path / "project")
+    first = service.compile(folder)
+    assert not first.cached and Path(first.pdf).read_text() == "first"
+    assert service.compile(folder).cached
+    (tmp_path / "project" / "main.tex").write_text("second")
+    assert not service.compile(folder).cached
+    builds = (tmp_path / "builds.txt").read_text()
+    assert builds.count("start") == 2
+
+
+def test_compile_debounce_and_cancel(tmp_path: Path) -> None:
+    service = stub_service(tmp_path, release=False)
+    folder = str(tmp_path / "project")
+    results = []
+    done = Event()
+
+    def on_done(result: CompileResult) -> None:
+        results.append(result)
+        done.set()
+
+    for _ in range(3):
+        service.request(folder, on_done)
+    builds = tmp_path / "builds.txt"
+    wait_until(builds.exists)
+    (tmp_path / "project" / "main.tex").write_text("newer")
+    service.request(folder, on_done)
+    # first build is blocked until release, so it is always cancelled
+    wait_until(lambda: builds.read_text().count("start") == 2)
+    (tmp_path / "release").touch()
+    assert done.wait(10)
+    assert builds.read_text().count("start") == 2
+    assert len(results) == 1
+    assert Path(results[0].pdf).read_text() == "newer"
+
+
+def test_compile_error_is_reported(tmp_path: Path) -> None:
+    (tmp_path / "main.tex").write_text("text")
+    service = CompileService(
+        [str(tmp_path / "missing-compiler")],
+        delay=0,
+        cache=str(tmp_path / "cache")
+    )
+    results = Queue()
+    service.request(str(tmp_path), results.put)
+    result = results.get(timeout=10)
+    assert result.pdf is None and result.returncode == -1
+    assert "FileNotFoundError" in result.log
+
+
+def test_cli_export(tmp_path: Path) -> None:
+    (tmp_path / "ProjectData").mkdir()
+    (tmp_path / "ProjectData" / "start.txt").write_text(
+        Path("ProjectData/start.txt").read_text()
+    )
+    for name in ("Good", "Broken"):
+        (tmp_path / "UserData" / name).mkdir(parents=True)
+    TexFile(str(tmp_path / "UserData" / "Good") + "/", "Good.json").save()
+    (tmp_path / "UserData" / "Good" / "fig.png").write_bytes(b"picture")
+    (tmp_path / "UserData" / "Broken" / "Broken.json").write_text("{")
+    projects = {
+        name: [f"UserData/{name}/", f"{name}.json"]
+        for name in ("Good", "Broken")
+    }
+    (tmp_path / "ProjectData" / "SETTINGS.json").write_text(
+        json.dumps({"projects": projects, "packing": "copy"})
+    )
+    cli = str(Path(__file__).parent / "cli.py")
+
+    def run(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, cli, *args], cwd=tmp_path,
+            capture_output=True, text=True, timeout=60
+        )
+
+    done = run("export", "Good", "--out", "out")
+    assert done.returncode == 0
+    assert "Good: ok" in done.stdout
+    assert "    fig.png: copy, " in done.stdout
+    assert "Exported 1/1 projects" in done.stdout
+    assert (tmp_path / "out" / "Good" / "main.tex").exists()
+
+    done = run("export", "--all", "Missing", "--out", "out", "--jobs", "2")
+    assert done.returncode == 1
+    assert "Exported 1/2 projects" in done.stdout
+    assert "Broken: failed" in done.stdout
+    assert "Broken failed:" in done.stdout
+    assert "JSONDecodeError" in done.stdout
+
+    done = run("export", "Good", "Missing", "--out", "out")
+    assert done.returncode == 1
+    assert "Exported 1/2 projects" in done.stdout
+    assert "Missing failed:\nNo such project." in done.stdout
+
+    done = run("list")
+    assert done.returncode == 0 and done.stdout.split() == ["Good", "Broken"]
+    assert run("export", "--out", "out").returncode == 2
+
+
+def test_gui_modules_load_settings_lazily(tmp_path: Path) -> None:
+    code = (
+        "import main, pmenu, pviev, toplevel, settings\n"
+        "assert settings._settings is None"
+    )
+    done = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, capture_output=True,
+        text=True, timeout=60,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parent)}
+    )
+    assert done.returncode == 0, done.stderr
+
+
+def test_project_index() -> None:
+    index = ProjectIndex(["Ohm law", "ohm fit", "Newton", "Pendulum"])
+    assert index.prefix("OH") == ["ohm fit", "Ohm law"]
+    assert index.search("pendlum") == ["Pendulum"]
+    index.rename("Newton", "Kepler")
+    index.remove("ohm fit")
+    index.add("Ohm law")
+    assert index.search("ohm") == ["Ohm law"]
+    assert index.search("kep") == ["Kepler"]
+    assert "Newton" not in index.search("newt")
+
+
+class FakeEditor:
+    def __init__(self, section: str) -> None:
+        self.section = section
+        self.shown = False
+        self.destroyed = False
+
+    def place(self, **kwargs) -> None:
+        self.shown = True
+
+    def place_forget(self) -> None:
+        self.shown = False
+
+    def destroy(self) -> None:
+        self.destroyed = True
+
+
+def test_editor_cache() -> None:
+    synced = []
+    cache = EditorCache(
+        FakeEditor, lambda section, _: synced.append(section), budget=10
+    )
+    intro = cache.show("intro", 4)
+    assert cache.show("intro", 4) is intro
+    method = cache.show("method", 4)
+    assert method.shown and not intro.shown
+    cache.show("results", 4)
+    assert intro.destroyed and synced == ["intro"]
+    assert [section for section, _ in cache.items()] == ["method", "results"]
+    cache.resize("results", 20)
+    cache.evict()
+    assert cache.get("results") is not None and cache.get("method") is None
+    cache.drop("results", sync=False)
+    assert synced == ["intro", "method"] and cache.current is None
+    assert text_widget(intro) is intro
+
+
+def test_insert_snippet(tmp_path: Path) -> None:
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.add_section("Method")
+    tex_file.text.take_dirty()
+    tex_file.insert("Method", "ab")
+    tex_file.insert("Method", "X", 1)
+    assert tex_file.text["Method"] == "aXb"
+    assert tex_file.text.take_dirty()[0] == {"Method": "aXb"}
+
+
+def test_editor_snippet_and_sync(tk_root: Tk, tmp_path: Path) -> None:
+    from pviev import ProjectWindow
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.add_section("Method")
+    tex_file.text["Method"] = "ab"
+    window = SimpleNamespace(
+        main_frame=tk_root,
+        font=None,
+        tex_file=tex_file,
+        autosave=SimpleNamespace(mark_dirty=lambda: None)
+    )
+    editor = ProjectWindow.create_editor(window, "Method")
+    window.editors = SimpleNamespace(
+        get=lambda _: editor, resize=lambda *_: None
+    )
+    text = text_widget(editor)
+    assert isinstance(text, Text) and text is not editor
+    text.mark_set(INSERT, "1.1")
+    ProjectWindow.insert_snippet(window, "Method", "X")
+    assert text.get("1.0", "end-1c") == tex_file.text["Method"] == "aXb"
+    text.insert("end", "c")
+    ProjectWindow.sync_editor(window, "Method", editor)
+    assert tex_file.text["Method"] == "aXbc"
+
+
+def test_windowed_buffer() -> None:
+    rows = "\n".join(f"{num} & {num ** 2} \\\\" for num in range(100))
+    text = "\n".join(
+        [f"line {num}" for num in range(300)]
+        + ["\\begin{tabular}{cc}", rows, "\\end{tabular}", "end"]
+    )
+    buffer = WindowedBuffer(text, window=100, margin=10)
+    assert len(buffer.lines) == 304 and len(buffer.folds) == 1
+    assert buffer.window.split("\n")[-1] == "line 99"
+    buffer.commit(buffer.window.replace("line 5\n", ""))
+    assert buffer.move(150).startswith("line 141")
+    assert buffer.move(1000).endswith("end") and buffer.at_bottom()
+    placeholder = buffer.lines[-3]
+    assert buffer.text() == text.replace("line 5\n", "")
+    assert buffer.unfold(placeholder) == rows
+    assert buffer.unfold("line 1") is None
+
+
+def test_windowed_buffer_keeps_folds() -> None:
+    rows = "\n".join(f"{num} & {num ** 2} \\\\" for num in range(100))
+    text = "\n".join(
+        ["start", "\\begin{tabular}{cc}", rows, "\\end{tabular}", "end"]
+    )
+    buffer = WindowedBuffer(text)
+    placeholder = buffer.lines[2]
+    assert buffer.is_placeholder(placeholder)
+    for window in (
+            buffer.window.replace(placeholder, placeholder[:-1] + "x"),
+            buffer.window.replace(placeholder + "\n", ""),
+            buffer.window.replace(placeholder, f"{placeholder}\n{placeholder}")
+    ):
+        with pytest.raises(ValueError):
+            buffer.commit(window)
+        assert buffer.text() == text
+    buffer.commit(buffer.window.replace("start", "begin"))
+    assert buffer.text() == text.replace("start", "begin")
+
+
+def test_lex_line() -> None:
+    tokens, state = lex_line(r"\textbf{a} $x^2$ \% % note", "")
+    assert tokens == [
+        ("command", 0, 7), ("math", 11, 16), ("command", 17, 19),
+        ("comment", 20, 26)
+    ]
+    assert state == ""
+    tokens, state = lex_line(r"\begin{equation} a = \frac", "")
+    assert state == "equation" and ("math", 16, 26) in tokens
+    tokens, state = lex_line(r"b \end{equation} c", state)
+    assert state == "" and tokens[0] == ("math", 0, 2)
+
+
+def test_highlighter_resumes() -> None:
+    lines = ["text $a"] + ["x"] * 50 + ["b$ done"]
+    lexed = []
+
+    def get_line(num: int) -> str:
+        lexed.append(num)
+        return lines[num]
+
+    highlighter = Highlighter(get_line)
+    tokens = list(highlighter.tokens(51, 51))
+    assert tokens[0] == (51, ("math", 0, 2))
+    lines[20] = "y"
+    highlighter.edit(20, 1, 1)
+    lexed.clear()
+    list(highlighter.tokens(51, 51))
+    assert lexed == [20, 51]
+    lines[0] = "text"
+    highlighter.edit(0, 1, 1)
+    assert next(highlighter.tokens(51, 51)) == (51, ("math", 1, 7))
+
+
+def test_highlighter_edits_before_resume() -> None:
+    lines = ["x"] * 10 + ["$a", "b$"] + ["y"] * 10
+    highlighter = Highlighter(lambda num: lines[num])
+    highlighter.ensure(21)
+    lines[2:3] = ["x"] * 5
+    highlighter.edit(2, 1, 5)
+    lines[4:5] = ["$c", "x"]  # after lexed states, before resumed tail
+    highlighter.edit(4, 1, 2)
+    fresh = Highlighter(lambda num: lines[num])
+    fresh.ensure(len(lines) - 1)
+    highlighter.ensure(len(lines) - 1)
+    assert highlighter.states == fresh.states
+
+
+class FakeText:
+    """Text widget of Tcl interpreter, without display."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.history = []
+        self.commands = {}
+        self.tk = self
+
+    def __str__(self) -> str:
+        return ".text"
+
+    def offset(self, index: str) -> int:
+        match = re.fullmatch(r"(end|(\d+)\.(\d+))( lineend)?([+-]1c)?", index)
+        lines = self.text.split("\n")
+        if match[1] == "end":
+            offset = len(self.text)
+        else:
+            line = min(int(match[2]), len(lines)) - 1
+            offset = sum(len(text) + 1 for text in lines[:line])
+            offset += len(lines[line]) if match[4] \
+                else min(int(match[3]), len(lines[line]))
+        if match[5]:
+            offset += 1 if match[5] == "+1c" else -1
+        return max(0, min(offset, len(self.text)))
+
+    def index(self, index: str) -> str:
+        before = self.text[:self.offset(index)]
+        return f"{before.count(chr(10)) + 1}.{len(before.split(chr(10))[-1])}"
+
+    def get(self, first: str, last: str) -> str:
+        return self.text[self.offset(first):self.offset(last)]
+
+    def call(self, *args):
+        if args[0] == "rename":
+            return None
+        name, command, *args = args[0]
+        assert name == ".text_highlighted"
+        if command == "index":
+            return self.index(args[0])
+        if command == "edit":
+            self.text = self.history.pop()
+            return ""
+        if command in ("yview", "see"):
+            return ""
+        self.history.append(self.text)
+        if command == "insert":
+            offset = self.offset(args[0])
+            self.text = self.text[:offset] + args[1] + self.text[offset:]
+        else:
+            first = self.offset(args[0])
+            last = self.offset(args[1]) if len(args) > 1 else first + 1
+            self.text = self.text[:first] + self.text[last:]
+        return ""
+
+    def createcommand(self, name: str, func) -> None:
+        self.commands[name] = func
+
+    def tag_config(self, *args, **kwargs) -> None:
+        pass
+
+    tag_raise = bind = after_idle = tag_config
+
+
+def test_text_highlighter_tracks_all_edits() -> None:
+    text = FakeText("a\n" * 30 + "end")
+    tracked = TextHighlighter(text)
+    widget = text.commands[".text"]
+
+    def states() -> List[str]:
+        fresh = Highlighter(lambda num: text.text.split("\n")[num])
+        fresh.ensure(30)
+        tracked.highlighter.ensure(30)
+        assert tracked.highlighter.states == fresh.states
+        return fresh.states
+
+    assert states() == [""] * 31
+    widget("insert", "3.1", "$ pasted\nlines")  # paste, middle-click
+    assert states()[10] == "$"
+    widget("delete", "3.1", "3.2")
+    assert states() == [""] * 31
+    widget("edit", "undo")
+    assert states()[10] == "$"
+    tracked.scheduled = False
+    widget("yview")
+    assert not tracked.scheduled
+    widget("yview", "moveto", "0.5")  # scrollbar
+    assert tracked.scheduled
+    tracked.scheduled = False
+    widget("see", "insert")  # keyboard
+    assert tracked.scheduled
+
+
+def test_text_highlighter_wraps_inner_text(tk_root: Tk) -> None:
+    from customtkinter import CTkTextbox
+    editor = CTkTextbox(tk_root)
+    text = text_widget(editor)
+    text.insert("1.0", "a\n" * 30 + "end")
+    tracked = TextHighlighter(editor)
+    assert tracked.text is text
+
+    def states() -> List[str]:
+        fresh = Highlighter(
+            lambda num: text.get(f"{num + 1}.0", f"{num + 1}.0 lineend")
+        )
+        fresh.ensure(31)
+        tracked.highlighter.ensure(31)
+        assert tracked.highlighter.states == fresh.states
+        return fresh.states
+
+    assert states() == [""] * 32
+    editor.insert("3.1", "$ typed\nline")
+    assert states()[10] == "$"
+    text.delete("3.1", "3.2")
+    assert states() == [""] * 32
+
+
+def test_label_index() -> None:
+    index = LabelIndex({
+        "Intro": "\\label{fig:1} see \\ref{tab:1} and \\cref{eq:1,fig:1}",
+        "Method": "\\label{fig:1}\n% \\label{eq:1}\n"
+        + "\\includegraphics[width=.75\\textwidth]{plot.png}",
+    })
+    assert index.duplicates() == ["fig:1"]
+    assert index.dangling() == ["eq:1", "tab:1"]
+    assert index.unique("figure") == "fig:2"
+    assert index.unique("figure") == "fig:3"
+    index.update("Method", "\\label{eq:1}")
+    assert index.duplicates() == [] and index.dangling() == ["tab:1"]
+    index.sync({"Intro": "\\ref{tab:1}"})
+    assert "eq:1" not in index.labels
+    assert index.warnings(["plot"]) == [
+        "Reference to undefined label 'tab:1'."
+    ]
+
+
+def test_new_label(tmp_path: Path) -> None:
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.text[Sections.INTRO] = "\\label{tab:1}\\ref{fig:9}"
+    (tmp_path / "table1.tex").write_text("\\begin{longtable}\n\\label{tab:2}")
+    assert tex_file.new_label("table") == "tab:3"
+    assert tex_file.check_labels() == [
+        "Reference to undefined label 'fig:9'."
+    ]
+
+
+def test_text_index(tmp_path: Path) -> None:
+    tex_file = TexFile(str(tmp_path) + "/", "Ohm.json")
+    tex_file.add_section("Fit")
+    tex_file.text["Fit"] = "Data\nOhm law fit of $U(I)$\nOhm"
+    tex_file.save()
+    index = search.text_index()
+    assert index.search("ohm fi") == [
+        ("Ohm", "Fit", 2, "Ohm law fit of $U(I)$")
+    ]
+    tex_file.text["Fit"] = "Newton"
+    tex_file.save()
+    assert index.search("ohm") == []
+    index.rename("Ohm", "Newton")
+    assert index.search("newton")[0].project == "Newton"
+    index.remove("Newton")
+    assert index.projects() == set()
+    assert index.add_missing({"Ohm": [str(tmp_path), "Ohm.json"]}) == 1
+    assert index.search("newton")[0].section == "Fit"
+
+
+def test_equation_store(
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path
+) -> None:
+    store = EquationStore(":memory:")
+    backup = tmp_path / "equations.backup.json"
+    settings = {"mode": "Light", "equations": {"Ohm Law": "I = U/R"}}
+    assert store.migrate(settings, str(backup))
+    assert settings == {"mode": "Light"}
+    assert not store.migrate(settings, str(backup))
+    assert store.migrate({"equations": {"Hooke": "F = kx"}}, str(backup))
+    assert json.loads(backup.read_text()) == {
+        "equations": {"Ohm Law": "I = U/R", "Hooke": "F = kx"}
+    }
+    for num in range(100):
+        store.add(Mode.EQUATION, f"Fit {num}", f"y = {num}x")
+    assert not store.add(Mode.EQUATION, "Fit 1", "y = x")
+    assert store.names(Mode.EQUATION, "law") == ["Ohm Law"]
+    assert store.names(Mode.EQUATION, "1", limit=3) == [
+        "Fit 1", "Fit 10", "Fit 11"
+    ]
+    assert store.names(Mode.DISPLAYMATH) == []
+    monkeypatch.setattr(equations, "_equation_store", store)
+    assert "\ty = 7x\n" in LatexMath.write_equation("Fit 7", "eq:1")
+    store.remove(Mode.EQUATION, "Fit 7")
+    with pytest.raises(KeyError):
+        LatexMath.write_equation("Fit 7")
+
+
+def test_store_pics(tmp_path: Path) -> None:
+    pics = []
+    for num in range(12):
+        (tmp_path / f"{num}.png").write_bytes(bytes([num % 10]))
+        pics.append((str(tmp_path / f"{num}.png"), f"{num}.png"))
+    tex_file = TexFile(str(tmp_path) + "/", "project.json")
+    tex_file.store = BlobStore(str(tmp_path / "blobs"))
+    events = Queue()
+    assert tex_file.store_pics(pics, Job("Copy", events), workers=4) == 10
+    assert [events.get()[2][0] for _ in pics] == list(range(1, 13))
+    assert tex_file.assets["10.png"] == tex_file.assets["0.png"]
+    assert json.loads((tmp_path / ".assets.json").read_text()).keys() \
+        == {name for _, name in pics}
+
+
+def test_render_file(tmp_path: Path) -> None:
+    for num in (10, 2, 1):
+        (tmp_path / f"run_{num}.csv").write_text(f"t;U\n0,5;{num}\n")
+    (tmp_path / "notes.txt").write_text("not data")
+    (tmp_path / "broken.xlsx").write_text("not excel")
+    paths = find_files(str(tmp_path))
+    assert [Path(path).name for path in paths] == [
+        "broken.xlsx", "run_1.csv", "run_2.csv", "run_10.csv"
+    ]
+    assert find_files(str(tmp_path / "run_1*.csv")) == [
+        str(tmp_path / "run_1.csv"), str(tmp_path / "run_10.csv")
+    ]
+    results = [
+        render_file(path, ",", ";", f"tab:{num}")
+        for num, path in enumerate(paths)
+    ]
+    assert results[0].error and not results[0].tex
+    assert "\\caption{run\\_2}" in results[2].tex
+    assert "\\label{tab:3}" in results[3].tex
+    assert "0,5&10" in results[3].tex
+    result = render_file(paths[1], ",", ";", "tab:1", digits=2)
+    assert "0,50&1\\\\ \\hline" in result.tex
+
+
+def test_table_batch() -> None:
+    complete = []
+    batch = TableBatch(["a.csv", "dir/b.xlsx", "c.csv"], complete.append)
+    batch.add(2, TableResult("c.csv", "c", ""))
+    batch.fail(1, RuntimeError("worker died"))
+    assert not complete and batch.done == 2
+    batch.add(0, TableResult("a.csv", "a", ""))
+    assert complete == [[
+        TableResult("a.csv", "a", ""),
+        TableResult("b.xlsx", "", "worker died"),
+        TableResult("c.csv", "c", "")
+    ]]
+    cancelled = []
+    batch = TableBatch(["a.csv", "b.csv"], complete.append,
+                       lambda: cancelled.append(True))
+    batch.add(0, TableResult("a.csv", "a", ""))
+    batch.cancel()
+    batch.cancel()
+    batch.add(1, TableResult("b.csv", "b", ""))
+    assert cancelled == [True] and len(complete) == 1
+
+
+def test_number_format() -> None:
+    df = DataFrame({
+        "t": [9.996, 0.012345, 1234.5, float("nan")],
+        "n": [1, 2, 3, 4],
+        "U": [10.500000000001, 2.25, 3.0, 4.0],
+        "dU": [0.0123, 0.46, 0.0, float("nan")],
+    })
+    formatted = NumberFormat(digits=3).apply(df[["t", "n"]])
+    assert formatted["t"].tolist() == ["10.0", "0.0123", "1230", ""]
+    assert formatted["n"].tolist() == [1, 2, 3, 4]
+    formatted = NumberFormat(
+        precision={"t": 1, "n": 2}, errors={"U": "dU"}, decimal=","
+    ).apply(df)
+    assert list(formatted.columns) == ["t", "n", "U"]
+    assert formatted["t"].tolist() == ["10,0", "0,0", "1234,5", ""]
+    assert formatted["n"].tolist() == ["1,00", "2,00", "3,00", "4,00"]
+    assert formatted["U"].tolist() == [
+        "$10,500 \\pm 0,012$", "$2,25 \\pm 0,46$", "3,0", "4,0"
+    ]
+
+
+def test_number_format_extremes() -> None:
+    df = DataFrame({
+        "a": [1e-320, 1e300, float("inf"), -float("inf"), float("nan")],
+        "e": [3e-322, 1e298, 1.0, 1.0, 1.0],
+    })
+    infinite = ["$\\infty$", "$-\\infty$", ""]
+    formatted = NumberFormat(digits=3, decimal=",").apply(df)
+    assert formatted["a"].tolist() == [
+        "$1,00 \\times 10^{-320}$", "$1,00 \\times 10^{300}$", *infinite
+    ]
+    assert NumberFormat().apply(df)["a"].tolist()[2:] == infinite
+    for number_format in (NumberFormat(decimal=","), NumberFormat(3)):
+        assert number_format.apply(df[:0])["a"].tolist() == []
+    assert NumberFormat(precision={"a": 2}).apply(df)["a"].tolist() == [
+        "0.00", "$1 \\times 10^{300}$", *infinite
+    ]
+    assert NumberFormat(errors={"a": "e"}).apply(df)["a"].tolist() == [
+        "$1.00 \\times 10^{-320} \\pm 3.0 \\times 10^{-322}$",
+        "$1.000 \\times 10^{300} \\pm 1.0 \\times 10^{298}$",
+        *infinite
+    ]
+
+
+def test_number_format_table() -> None:
+    df = DataFrame({"t": [0.5, 10.500000000001], "n": [1, 2]})
+    plain = LatexTable(df).render_tab()
+    assert plain == LatexTable(df).write_tab()
+    assert "10.500000000001&2" in plain
+    table = LatexTable(df, number_format=NumberFormat(digits=2, decimal=","))
+    assert "0,50&1\\\\ \\hline\n11&2" in table.render_tab()
+    longtable = LatexLongTable(iter([df]), number_format=NumberFormat(2))
+    assert "11&2" in "".join(longtable.fragments())
+
+
+def test_to_numbers() -> None:
+    df = to_numbers(DataFrame({
+        "a": ["0,5", " 1234,25", None], "b": ["x", "1,0", "2"], "c": [1, 2, 3]
+    }), ",")
+    assert df["a"].tolist()[:2] == [0.5, 1234.25]
+    assert df["b"].tolist() == ["x", "1,0", "2"]
+    assert df["c"].tolist() == [1, 2, 3]
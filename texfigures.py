@@ -2,28 +2,62 @@
 Module contains classes that are used to create figures, tables and
 math objects in TeX file.
 """
-from typing import Dict
+from __future__ import annotations
 
-import pandas as pd
+from typing import (TYPE_CHECKING, Iterable, Iterator, List, Optional,
+                    TextIO)
 
-from settings import SETTINGS
+from equations import equation_store
+from settings import Mode
+
+if TYPE_CHECKING:  # pandas is imported when first table is written
+    import pandas as pd
+
+    from numformat import NumberFormat
+
+
+TEX_SPECIAL = {
+    "&": "\\&",
+    "%": "\\%",
+    "$": "\\$",
+    "#": "\\#",
+    "_": "\\_",
+    "{": "\\{",
+    "}": "\\}",
+    "~": "\\textasciitilde{}",
+    "^": "\\textasciicircum{}",
+    "\\": "\\textbackslash{}",
+}
+
+
+def escape_tex(text: str) -> str:
+    """Escape characters with special meaning in TeX.
+
+    Args:
+        text (str): Plain text, e.g. name of file.
+
+    Returns:
+        str: Text, which can be put in TeX document.
+    """
+    return text.translate(str.maketrans(TEX_SPECIAL))
 
 
 class LatexFigure:
     """Class representing a Latex figure."""
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, label: str = "mylabel") -> None:
         """Constructor of LatexFigure class.
 
         Args:
             name (str): Name of the Latex figure.
+            label (str): Label of the figure.
         """
         self.figure = str(
                 "\n\\begin{figure}[h!]\n"
                 + "\t\\centering\n"
                 + f"\t\\includegraphics[width=.75\\textwidth]{{{name}}}\n"
                 + "\t\\caption{caption}\n"
-                + "\t\\label{mylabel}\n"
+                + f"\t\\label{{{label}}}\n"
                 + "\\end{figure}"
         )
 
@@ -31,14 +65,28 @@ class LatexFigure:
 class LatexTable:
     """Class representing a Latex table."""
 
-    def __init__(self, df: pd.DataFrame) -> None:
+    def __init__(
+            self,
+            df: pd.DataFrame,
+            label: str = "mylabel",
+            caption: str = "",
+            number_format: Optional[NumberFormat] = None
+    ) -> None:
         """Constructor of LatexTable class.
 
         Args:
             df (pd.DataFrame): Dataframe to be transformed into latex
                 table.
+            label (str): Label of the table.
+            caption (str): Caption of the table, TeX code.
+            number_format (Optional[NumberFormat]): Formatting of
+                numeric columns, values are written as they are if None.
         """
+        if number_format is not None:
+            df = number_format.apply(df)
         self.df = df
+        self.label = label
+        self.caption = caption
         self.rows_num = df.shape[0]
         self.cols_num = df.shape[1]
 
@@ -47,14 +95,14 @@ class LatexTable:
         repr = (
             "\n\\begin{table}[h!]\n"
             + "\\centering\n"
-            + "\\caption{}\n"
+            + f"\\caption{{{self.caption}}}\n"
             + "\\begin{tabular}{|" + "r|"*self.cols_num + "}\n"
             + "\\hline"
         )
-        repr += self.write_tab()
+        repr += self.render_tab()
         repr += (
             "\n\\end{tabular}\n"
-            + "\\label{mylabel}\n"
+            + f"\\label{{{self.label}}}\n"
             + "\\caption*{Gdzie}\n"
             + "\\end{table}"
         )
@@ -76,26 +124,192 @@ class LatexTable:
         repr += "\\\\ \\hline\n"
         return repr
 
+    def render_tab(self) -> str:
+        """Column-wise equivalent of `write_tab`.
+
+        Whole columns are formatted at once and rows are joined with a
+        single `str.join`, so the cost grows linearly with the number
+        of cells. Output is identical to `write_tab`.
+        """
+        return "\\\\ \\hline\n".join(
+            [self.header(self.df.columns), *self.render_rows(self.df)]
+        ) + "\\\\ \\hline\n"
+
+    @staticmethod
+    def header(columns: pd.Index) -> str:
+        """Render header row of the table, without separator.
+
+        Args:
+            columns (pd.Index): Column names.
+
+        Returns:
+            str: ``&``-joined column titles.
+        """
+        last = columns[-1] if len(columns) else None
+        return "".join(
+            f"\\multicolumn{1}{{|l|}}{{{col}}}"
+            + ("&" if col != last else "")
+            for col in columns
+        )
+
+    @staticmethod
+    def format_column(column: pd.Series) -> List[str]:
+        """Format every cell of a column the way `write_tab` does.
+
+        Args:
+            column (pd.Series): Column to be formatted.
+
+        Returns:
+            List[str]: Text of each cell.
+        """
+        import numpy as np
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+            return column.to_numpy().astype(str).tolist()
+        return [f"{value}" for value in column.array]
+
+    @classmethod
+    def render_rows(cls, df: pd.DataFrame) -> List[str]:
+        """Render data rows of the frame, without separators.
+
+        Args:
+            df (pd.DataFrame): Data to be rendered.
+
+        Returns:
+            List[str]: One ``&``-joined string per row.
+        """
+        if not df.shape[1]:
+            return [""] * df.shape[0]
+        columns = [
+            cls.format_column(df.iloc[:, j]) for j in range(df.shape[1])
+        ]
+        return ["&".join(cells) for cells in zip(*columns)]
+
+
+class LatexLongTable:
+    """Class representing a Latex longtable written chunk by chunk.
+
+    Only one chunk of data is held at a time, so tables far larger than
+    memory can be written straight to a file.
+    """
+
+    def __init__(
+            self,
+            chunks: Iterable[pd.DataFrame],
+            label: str = "mylabel",
+            number_format: Optional[NumberFormat] = None
+    ) -> None:
+        """Constructor of LatexLongTable class.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Consecutive parts of the
+                table, e.g. ``pd.read_csv(..., chunksize=n)``.
+            label (str): Label of the table.
+            number_format (Optional[NumberFormat]): Formatting of
+                numeric columns, applied to every chunk.
+        """
+        self.chunks = chunks
+        self.label = label
+        self.number_format = number_format
+        self.rows_num = 0
+
+    def fragments(self) -> Iterator[str]:
+        """Generate TeX representation of table piece by piece.
+
+        Yields:
+            str: Head of the table, then body of each chunk, then foot.
+        """
+        head_written = False
+        for chunk in self.chunks:
+            if self.number_format is not None:
+                chunk = self.number_format.apply(chunk)
+            if not head_written:
+                yield self.head(chunk.columns, self.label)
+                head_written = True
+            self.rows_num += chunk.shape[0]
+            yield "".join(
+                row + "\\\\ \\hline\n"
+                for row in LatexTable.render_rows(chunk)
+            )
+        if head_written:
+            yield self.foot()
+
+    def write(self, file: TextIO) -> int:
+        """Write whole table to file.
+
+        Args:
+            file (TextIO): Opened text file.
+
+        Returns:
+            int: Number of written rows.
+        """
+        for fragment in self.fragments():
+            file.write(fragment)
+        return self.rows_num
+
+    @staticmethod
+    def head(columns: pd.Index, label: str = "mylabel") -> str:
+        """Opening of the longtable, repeated header included.
+
+        Args:
+            columns (pd.Index): Column names.
+            label (str): Label of the table.
+        """
+        header = LatexTable.header(columns)
+        return (
+            "\\begin{longtable}{|" + "r|"*len(columns) + "}\n"
+            + "\\caption{}\n"
+            + f"\\label{{{label}}}\\\\\n"
+            + "\\hline\n"
+            + header + "\\\\ \\hline\n"
+            + "\\endfirsthead\n"
+            + "\\hline\n"
+            + header + "\\\\ \\hline\n"
+            + "\\endhead\n"
+        )
+
+    @staticmethod
+    def foot() -> str:
+        """Closing of the longtable."""
+        return "\\end{longtable}\n"
+
 
 class LatexMath:
     """Class representing a Latex math object."""
-    EQUATIONS: Dict[str, str] = SETTINGS["equations"]
-    DISPLAYMATH: Dict[str, str] = SETTINGS["displaymath"]
+
+    @staticmethod
+    def saved(kind: str, name: str) -> str:
+        """Equation from library.
+
+        Args:
+            kind (str): `Mode.EQUATION` or `Mode.DISPLAYMATH`.
+            name (str): Name of equation.
+
+        Raises:
+            KeyError: if there is no such equation.
+
+        Returns:
+            str: TeX code of equation.
+        """
+        body = equation_store().get(kind, name)
+        if body is None:
+            raise KeyError(name)
+        return body
 
     @classmethod
-    def write_equation(cls, equation: str) -> str:
+    def write_equation(cls, equation: str, label: str = "mylabel") -> str:
         """Write equation to tex file.
 
         Args:
             equation (str): equation to be written.
+            label (str): Label of the equation.
 
         Returns:
             str: tex equation.
         """
         equation_repr = str(
             "\n\\begin{equation}\n"
-            + "\t\\label{mylabel}\n"
-            + f"\t{cls.EQUATIONS[equation]}\n"
+            + f"\t\\label{{{label}}}\n"
+            + f"\t{cls.saved(Mode.EQUATION, equation)}\n"
             + "\\end{equation}"
         )
         return equation_repr
@@ -113,7 +327,7 @@ class LatexMath:
         dspmath_repr = str(
             "\n\\begin{displaymath}\n"
             + "\t\\begin{split}\n"
-            + f"\t\t {cls.DISPLAYMATH[displaymath]}\n"
+            + f"\t\t {cls.saved(Mode.DISPLAYMATH, displaymath)}\n"
             + "\t\\end{split}\n"
             + "\\end{displaymath}"
         )
@@ -6,19 +6,34 @@ user. There are several of them:
 new one, that can be saved for later,
 * EnterTable is used for importing excel or csv files, reading them and
 writing tables.
+* EnterTables is used for importing all data files of folder at once.
 * NewProject is used to create new project.
+* SearchTop is used for searching text of all projects.
 """
+from __future__ import annotations
+
+from functools import partial
+from tkinter import filedialog as fd
 from tkinter import messagebox as msg
-from typing import Callable
+from typing import (TYPE_CHECKING, Callable, Iterable, List, Mapping,
+                    Optional)
 
-import pandas as pd
 from customtkinter import (CTkButton, CTkEntry, CTkLabel, CTkOptionMenu,
                            CTkTextbox, CTkToplevel, StringVar,
                            set_appearance_mode)
 
-from settings import (SETTINGS, TOP_HEIGHT, TOP_WIDTH, Mode, Separators,
+import settings
+from equations import equation_store
+from jobs import JobScheduler
+from packing import STRATEGIES
+from search import text_index
+from settings import (CHUNK_SIZE, SIGNIFICANT_FIGURES, Mode, Separators,
                       update_settings)
-from texfigures import LatexMath
+
+if TYPE_CHECKING:  # pandas is imported when first file is read
+    import pandas as pd
+
+    from numformat import NumberFormat
 
 
 class EnterMath(CTkToplevel):
@@ -45,12 +60,10 @@ class EnterMath(CTkToplevel):
         self.mode = mode
         self.title = f"Enter {mode}"
         self.insert = insert
-        if mode == Mode.EQUATION:
-            self.options = list(LatexMath.EQUATIONS.keys())
-        elif mode == Mode.DISPLAYMATH:
-            self.options = list(LatexMath.DISPLAYMATH.keys())
-        else:
+        if mode not in (Mode.EQUATION, Mode.DISPLAYMATH):
             raise ValueError("Invalid mode")
+        self.store = equation_store()
+        self.options = self.store.names(mode)
         self.generate_gui()
 
     def generate_gui(self) -> None:
@@ -58,47 +71,70 @@ class EnterMath(CTkToplevel):
         label = CTkLabel(self, text="Chose what to insert:")
         label.grid(row=0, column=0, columnspan=3)
 
-        variable = StringVar(self, value=self.options[0])
+        search = CTkEntry(
+            self, placeholder_text="Search", width=settings.TOP_WIDTH
+        )
+        search.grid(row=1, column=0, columnspan=2)
+        search.bind("<KeyRelease>", lambda _: self.filter(search.get()))
 
-        combobox = CTkOptionMenu(
+        self.variable = StringVar(
+            self, value=self.options[0] if self.options else ""
+        )
+
+        self.combobox = CTkOptionMenu(
             self,
             values=self.options,
-            variable=variable,
-            width=TOP_WIDTH
+            variable=self.variable,
+            width=settings.TOP_WIDTH
         )
-        combobox.grid(row=1, column=0, columnspan=2)
+        self.combobox.grid(row=2, column=0, columnspan=2)
 
         text = CTkTextbox(
             self,
-            width=TOP_WIDTH,
-            height=TOP_HEIGHT//3 * 2
+            width=settings.TOP_WIDTH,
+            height=settings.TOP_HEIGHT//3 * 2
         )
-        text.grid(row=3, column=0, columnspan=2, rowspan=2)
+        text.grid(row=4, column=0, columnspan=2, rowspan=2)
 
         name_label = CTkLabel(
             self,
             text="Enter name and equation then press add button."
         )
-        name_label.grid(row=2, column=0, columnspan=2)
+        name_label.grid(row=3, column=0, columnspan=2)
 
         name_entry = CTkEntry(
             self,
         )
-        name_entry.grid(row=5, column=0, columnspan=2)
+        name_entry.grid(row=6, column=0, columnspan=2)
 
         insert_button = CTkButton(
             self,
             text=f"Insert {self.mode}",
-            command=lambda: self.insert(combobox.get(), self.mode)
+            command=self.insert_chosen
         )
-        insert_button.grid(row=5, column=2)
+        insert_button.grid(row=6, column=2)
 
         add_button = CTkButton(
             self,
             text=f"Add new {self.mode}",
             command=lambda: self.add_new(name_entry.get(), text)
         )
-        add_button.grid(row=6, column=2)
+        add_button.grid(row=7, column=2)
+
+    def filter(self, query: str) -> None:
+        """Show only names containing query.
+
+        Args:
+            query (str): Part of name.
+        """
+        self.options = self.store.names(self.mode, query)
+        self.combobox.configure(values=self.options)
+        self.variable.set(self.options[0] if self.options else "")
+
+    def insert_chosen(self) -> None:
+        """Insert chosen equation, if any."""
+        if self.variable.get():
+            self.insert(self.variable.get(), self.mode)
 
     def add_new(self, name: str, textbox: CTkTextbox) -> None:
         """Add new equation to app memeory.
@@ -113,14 +149,12 @@ class EnterMath(CTkToplevel):
             new_equation = textbox.get(1.0, "end-1c")
         if not new_equation or not name:
             return
-        if name in self.options:
+        if not self.store.add(self.mode, name, new_equation):
             msg.showerror(
                 title="Fatal Error",
                 message="Equation already exists."
             )
             return
-        SETTINGS[self.mode][name] = new_equation
-        update_settings(SETTINGS)
         self.destroy()
 
 
@@ -130,7 +164,11 @@ class EnterTable(CTkToplevel):
     def __init__(
             self,
             path: str,
-            add_tab: Callable[[pd.DataFrame], None],
+            add_tab: Callable[[pd.DataFrame, NumberFormat], None],
+            add_longtab: Callable[
+                [Iterable[pd.DataFrame], NumberFormat], None
+            ],
+            jobs: JobScheduler,
             *args,
             **kwargs
     ) -> None:
@@ -138,14 +176,23 @@ class EnterTable(CTkToplevel):
 
         Args:
             path (str): path to file with data
-            add_tab (Callable[[pd.DataFrame], None]): function inserting
-                the table.
+            add_tab (Callable[[pd.DataFrame, NumberFormat], None]):
+                function inserting the table, with format of numbers.
+            add_longtab (Callable[[Callable[
+                [], ContextManager[Iterable[pd.DataFrame]]
+            ], NumberFormat], None]): function streaming the file into
+                longtable, it is given function opening the file.
+            jobs (JobScheduler): Scheduler running reading of files.
         """
         super().__init__(*args, **kwargs)
         self.title = "Enter Table"
         self.path = path
         self.dfs = {}
         self.add_table = add_tab
+        self.add_longtable = add_longtab
+        self.jobs = jobs
+        self.decimal = Separators.DECIMAL[0]
+        self.digits = StringVar(self, SIGNIFICANT_FIGURES[0])
         self.generate_gui()
 
     def generate_gui(self) -> None:
@@ -156,7 +203,7 @@ class EnterTable(CTkToplevel):
         label_del = CTkLabel(self, text="Enter decimal separator")
         label_del.grid(row=0, column=1)
 
-        var_decimal = StringVar(self, Separators.DECIMAL[0])
+        var_decimal = StringVar(self, self.decimal)
 
         combo_decimal = CTkOptionMenu(
             self,
@@ -183,6 +230,15 @@ class EnterTable(CTkToplevel):
         )
         read_file_button.grid(row=1, column=2)
 
+        stream_button = CTkButton(
+            self,
+            text="Stream as longtable",
+            command=lambda: self.stream_file(
+                combo_decimal.get(), combo_separator.get()
+            )
+        )
+        stream_button.grid(row=2, column=2)
+
         try:
             sheets_var_text = list(self.dfs.keys())[-1]
         except IndexError:
@@ -199,56 +255,257 @@ class EnterTable(CTkToplevel):
         add_button = CTkButton(
             self,
             text="Add table",
-            command=lambda: self.add_table(
-                self.dfs[sheets_combo.get()]
-            )
+            command=lambda: self.load_sheet(sheets_combo.get())
         )
         add_button.grid(row=2, column=1)
 
+        label_digits = CTkLabel(self, text="Significant figures")
+        label_digits.grid(row=3, column=0)
+
+        combo_digits = CTkOptionMenu(
+            self,
+            values=SIGNIFICANT_FIGURES,
+            variable=self.digits
+        )
+        combo_digits.grid(row=3, column=1)
+
+    def number_format(self) -> NumberFormat:
+        """Format of numbers chosen by user, decimal separator of file
+        is used in table too.
+        """
+        from numformat import NumberFormat
+        digits = self.digits.get()
+        return NumberFormat(
+            digits=int(digits) if digits.isdigit() else None,
+            decimal=Separators.representation[self.decimal]
+        )
+
     def read_file(self, decimal: str, sep: str) -> None:
-        """Read the file.
+        """Read the file in background job.
 
         Args:
             decimal (str): Character to separating decimal values.
             sep (str): Character to separating columns.
         """
+        import pandas as pd
+
+        from datafiles import LazyWorkbook
+        self.decimal = decimal
         if self.path is None:
             msg.showerror(
                 title="Wrong file path",
                 message="You did not enter path to file!"
             )
+            return
         if self.path.endswith(".csv"):
-            try:
-                self.dfs = {
+            self.jobs.submit(
+                "Reading file",
+                lambda job: {
                     "sheet1": pd.read_csv(
                         self.path,
                         decimal=Separators.representation[decimal],
                         sep=Separators.representation[sep]
                     )
-                }
-            except pd.errors.ParserError:
-
-                msg.showerror(
-                    title="Fatal error",
-                    message=(
-                        "Error occurred while reading file, make sure"
-                        + " you pass correct separators and decimal separator"
-                    )
-                )
-            self.generate_gui()
+                },
+                on_done=self.file_read,
+                on_error=self.read_error
+            )
             return
         if not self.path.endswith(".xlsx"):
             msg.showerror(
                 title="Wrong file path",
                 message="File should be .csv or .xlsx type!"
             )
-        self.dfs = pd.read_excel(
-            self.path,
-            decimal=Separators.representation[decimal],
-            sheet_name=None
+            return
+        self.jobs.submit(
+            "Reading file",
+            lambda job: LazyWorkbook(
+                self.path,
+                decimal=Separators.representation[decimal]
+            ),
+            on_done=self.file_read,
+            on_error=self.read_error
         )
+
+    def file_read(self, dfs: Mapping[str, pd.DataFrame]) -> None:
+        """Show sheets of the file read in background.
+
+        Args:
+            dfs (Mapping[str, pd.DataFrame]): Sheets of the file.
+        """
+        self.dfs = dfs
         self.generate_gui()
 
+    def load_sheet(self, sheet: str) -> None:
+        """Parse the sheet in background and add it as table.
+
+        Args:
+            sheet (str): Name of the sheet.
+        """
+        if sheet not in self.dfs:
+            return
+        self.jobs.submit(
+            "Reading sheet",
+            lambda job: self.dfs[sheet],
+            on_done=lambda df: self.add_table(df, self.number_format()),
+            on_error=self.read_error
+        )
+
+    @staticmethod
+    def read_error(error: BaseException) -> None:
+        """Show error raised while reading the file.
+
+        Args:
+            error (BaseException): Raised error.
+        """
+        msg.showerror(
+            title="Fatal error",
+            message=(
+                "Error occurred while reading file, make sure"
+                + " you pass correct separators and decimal separator"
+                + f"\n{error}"
+            )
+        )
+
+    def stream_file(self, decimal: str, sep: str) -> None:
+        """Stream the `.csv` file into longtable, chunk by chunk, so
+        whole file is never held in memory.
+
+        Args:
+            decimal (str): Character to separating decimal values.
+            sep (str): Character to separating columns.
+        """
+        import pandas as pd
+        if self.path is None or not self.path.endswith(".csv"):
+            msg.showerror(
+                title="Wrong file path",
+                message="Only .csv files can be streamed!"
+            )
+            return
+        self.decimal = decimal
+        self.add_longtable(
+            partial(
+                pd.read_csv,
+                self.path,
+                decimal=Separators.representation[decimal],
+                sep=Separators.representation[sep],
+                chunksize=CHUNK_SIZE
+            ),
+            self.number_format()
+        )
+        self.destroy()
+
+
+class EnterTables(CTkToplevel):
+    """Class for creating window allowing to insert many tables."""
+
+    def __init__(
+            self,
+            import_tables: Callable[
+                [List[str], str, str, Optional[int]], None
+            ],
+            *args,
+            **kwargs
+    ) -> None:
+        """Constructor of EnterTables class.
+
+        Args:
+            import_tables (Callable[
+                [List[str], str, str, Optional[int]], None
+            ]): function inserting tables of files, with decimal and
+                column separator and significant figures.
+        """
+        super().__init__(*args, **kwargs)
+        self.title("Enter Tables")
+        self.import_tables = import_tables
+        self.generate_gui()
+
+    def generate_gui(self) -> None:
+        """Create GUI to display."""
+        label = CTkLabel(self, text="Enter folder or pattern of files")
+        label.grid(row=0, column=0, columnspan=2)
+
+        self.entry = CTkEntry(self, width=settings.TOP_WIDTH)
+        self.entry.grid(row=1, column=0, columnspan=2)
+
+        folder_button = CTkButton(
+            self,
+            text="Choose folder",
+            command=self.choose_folder
+        )
+        folder_button.grid(row=1, column=2)
+
+        label_sep = CTkLabel(self, text="Enter separator")
+        label_sep.grid(row=2, column=0)
+
+        label_del = CTkLabel(self, text="Enter decimal separator")
+        label_del.grid(row=2, column=1)
+
+        combo_separator = CTkOptionMenu(
+            self,
+            values=Separators.SEPARATORS,
+            variable=StringVar(self, Separators.SEPARATORS[0])
+        )
+        combo_separator.grid(row=3, column=0)
+
+        combo_decimal = CTkOptionMenu(
+            self,
+            values=Separators.DECIMAL,
+            variable=StringVar(self, Separators.DECIMAL[0])
+        )
+        combo_decimal.grid(row=3, column=1)
+
+        label_digits = CTkLabel(self, text="Significant figures")
+        label_digits.grid(row=4, column=0)
+
+        combo_digits = CTkOptionMenu(
+            self,
+            values=SIGNIFICANT_FIGURES,
+            variable=StringVar(self, SIGNIFICANT_FIGURES[0])
+        )
+        combo_digits.grid(row=4, column=1)
+
+        import_button = CTkButton(
+            self,
+            text="Import tables",
+            command=lambda: self.find_files(
+                combo_decimal.get(), combo_separator.get(),
+                combo_digits.get()
+            )
+        )
+        import_button.grid(row=4, column=2)
+
+    def choose_folder(self) -> None:
+        """Put folder chosen by user into the entry."""
+        folder = fd.askdirectory(title="Open folder")
+        if folder:
+            self.entry.delete(0, "end")
+            self.entry.insert(0, folder)
+
+    def find_files(self, decimal: str, sep: str, digits: str) -> None:
+        """Find data files and pass them to be inserted.
+
+        Args:
+            decimal (str): Character to separating decimal values.
+            sep (str): Character to separating columns.
+            digits (str): Significant figures, all if not a number.
+        """
+        from datafiles import find_files
+        paths = find_files(self.entry.get())
+        if not paths:
+            msg.showerror(
+                title="No files",
+                message="No .csv or .xlsx files found."
+            )
+            return
+        self.import_tables(
+            paths,
+            Separators.representation[decimal],
+            Separators.representation[sep],
+            int(digits) if digits.isdigit() else None
+        )
+        self.destroy()
+
 
 class NewProject(CTkToplevel):
     """Class representing New Project window."""
@@ -286,6 +543,48 @@ class NewProject(CTkToplevel):
         add_button.place(x=10, y=80)
 
 
+class SearchTop(CTkToplevel):
+    """Class representing window of search in all projects."""
+
+    def __init__(self, jobs: JobScheduler, *args, **kwargs) -> None:
+        """Constructor of SearchTop class, projects not indexed yet are
+        indexed in background.
+
+        Args:
+            jobs (JobScheduler): Scheduler of background jobs.
+        """
+        super().__init__(*args, **kwargs)
+        self.title("Search projects")
+        self.create_gui()
+        jobs.submit(
+            "Indexing projects",
+            lambda job: text_index().add_missing(
+                settings.SETTINGS["projects"], job
+            ),
+            on_done=lambda _: self.show_results()
+        )
+
+    def create_gui(self) -> None:
+        """Create GUI."""
+        self.entry = CTkEntry(self, width=settings.TOP_WIDTH)
+        self.entry.grid(row=0, column=0, padx=10, pady=10)
+        self.entry.bind("<KeyRelease>", lambda _: self.show_results())
+        self.results = CTkTextbox(
+            self, width=settings.TOP_WIDTH * 2, height=settings.TOP_HEIGHT * 2
+        )
+        self.results.grid(row=1, column=0, padx=10, pady=10)
+
+    def show_results(self) -> None:
+        """Show lines matching text of entry."""
+        if not self.winfo_exists():
+            return
+        self.results.delete(1.0, "end")
+        self.results.insert(1.0, "\n".join(
+            f"{hit.project} / {hit.section}:{hit.line}  {hit.text.strip()}"
+            for hit in text_index().search(self.entry.get())
+        ))
+
+
 class SettingsTop(CTkToplevel):
 
     def __init__(self, *args, **kwargs) -> None:
@@ -309,8 +608,26 @@ class SettingsTop(CTkToplevel):
         )
         mode.place(x=10, y=35)
 
+        label = CTkLabel(self, text="Choose packing of figures")
+        label.place(x=10, y=70)
+
+        packing = CTkOptionMenu(
+            self,
+            values=STRATEGIES,
+            variable=StringVar(
+                self, settings.SETTINGS.get("packing", STRATEGIES[0])
+            ),
+            command=self.change_packing
+        )
+        packing.place(x=10, y=95)
+
     def change_mode(self, new_mode: str) -> None:
         """Change the mode of the GUI."""
         set_appearance_mode(new_mode)
-        SETTINGS["mode"] = new_mode
-        update_settings(SETTINGS)
+        settings.SETTINGS["mode"] = new_mode
+        update_settings(settings.SETTINGS)
+
+    def change_packing(self, strategy: str) -> None:
+        """Change the strategy of packing figures on export."""
+        settings.SETTINGS["packing"] = strategy
+        update_settings(settings.SETTINGS)